@@ -26,6 +26,7 @@ DISPLAY_HEIGHT = 24
 CONTEXT_RADIUS = 1  # 3x3x3 context grid around current position
 MAX_RETRIES = 3
 RETRY_DELAY = 1  # seconds
+RETRY_MAX_DELAY = 30  # cap for jittered retry backoff, seconds
 
 # Movement Controls
 MOVEMENT_KEYS = {
@@ -2,12 +2,56 @@
 Character movement and position tracking for Cyberpunk Exploration Game
 """
 
+from math import sqrt
+
+import numpy as np
+
 from config import STARTING_POSITION, WORLD_MIN, WORLD_MAX
 
+# Axis indices into a (x, y, z) position
+AXIS_X = 0
+AXIS_Y = 1
+AXIS_Z = 2
+
+try:
+    # Numba is optional: when present the distance kernels below are
+    # JIT-compiled, otherwise they run as plain Python/NumPy
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _jit(func):
+    """Apply numba.njit when available, otherwise return func unchanged"""
+    if njit is None:
+        return func
+    return njit(cache=True, fastmath=True)(func)
+
+
+@_jit
+def _distance(x, y, z, cx, cy, cz):
+    """Euclidean distance between (x, y, z) and (cx, cy, cz)"""
+    dx = x - cx
+    dy = y - cy
+    dz = z - cz
+    return sqrt(dx * dx + dy * dy + dz * dz)
+
+
+@_jit
+def _distances(points, cx, cy, cz):
+    """Euclidean distances from an (N, 3) float array to one reference point"""
+    deltas = points - np.array((cx, cy, cz), dtype=np.float64)
+    return np.sqrt((deltas * deltas).sum(axis=1))
+
 
 class Character:
     """Character class for managing player position and movement in 3D space"""
-    
+
+    # No per-instance __dict__: slot storage shrinks each character to the
+    # two declared references and speeds up attribute access, which adds
+    # up when many agents are simulated
+    __slots__ = ('_pos', '_move_mask')
+
     def __init__(self, position=None):
         """
         Initialize character with starting position
@@ -17,109 +61,249 @@ class Character:
         """
         if position is None:
             position = STARTING_POSITION
-        
-        self.x, self.y, self.z = position
+
+        self._pos = list(position)
         self._validate_position()
-    
-    def _validate_position(self):
+        self._update_move_mask()
+
+    @property
+    def x(self):
+        """X coordinate"""
+        return self._pos[AXIS_X]
+
+    @x.setter
+    def x(self, value):
+        self._pos[AXIS_X] = value
+        self._update_move_mask()
+
+    @property
+    def y(self):
+        """Y coordinate"""
+        return self._pos[AXIS_Y]
+
+    @y.setter
+    def y(self, value):
+        self._pos[AXIS_Y] = value
+        self._update_move_mask()
+
+    @property
+    def z(self):
+        """Z coordinate"""
+        return self._pos[AXIS_Z]
+
+    @z.setter
+    def z(self, value):
+        self._pos[AXIS_Z] = value
+        self._update_move_mask()
+
+    def _validate_position(self, _hi=WORLD_MAX):
         """Validate that current position is within world bounds"""
-        if not (WORLD_MIN <= self.x <= WORLD_MAX):
-            raise ValueError(f"X coordinate {self.x} is out of bounds [{WORLD_MIN}, {WORLD_MAX}]")
-        if not (WORLD_MIN <= self.y <= WORLD_MAX):
-            raise ValueError(f"Y coordinate {self.y} is out of bounds [{WORLD_MIN}, {WORLD_MAX}]")
-        if not (WORLD_MIN <= self.z <= WORLD_MAX):
-            raise ValueError(f"Z coordinate {self.z} is out of bounds [{WORLD_MIN}, {WORLD_MAX}]")
+        x, y, z = self._pos
+        # Fast path: WORLD_MIN is 0, so one sign test of the OR-ed
+        # coordinates covers all three lower bounds; only out-of-bounds
+        # positions fall through to the per-axis diagnostics
+        if (x | y | z) >= 0 and x <= _hi and y <= _hi and z <= _hi:
+            return
+        for axis, value in (('X', x), ('Y', y), ('Z', z)):
+            if not (WORLD_MIN <= value <= WORLD_MAX):
+                raise ValueError(f"{axis} coordinate {value} is out of bounds [{WORLD_MIN}, {WORLD_MAX}]")
     
     @property
     def position(self):
         """Get current position as tuple (x, y, z)"""
-        return (self.x, self.y, self.z)
-    
+        return tuple(self._pos)
+
     @position.setter
     def position(self, new_position):
         """Set position and validate bounds"""
-        self.x, self.y, self.z = new_position
+        self._pos = list(new_position)
         self._validate_position()
-    
-    def move_up(self):
-        """Move up (increase Y coordinate)"""
-        if self.y < WORLD_MAX:
-            self.y += 1
+        self._update_move_mask()
+
+    def _update_move_mask(self):
+        """Recompute the allowed-moves bit mask for the current position
+
+        The six can_move_* predicates only change when the position does,
+        so each one becomes a single bit test between moves.
+        """
+        x, y, z = self._pos
+        self._move_mask = (
+            (y < WORLD_MAX)
+            | ((y > WORLD_MIN) << 1)
+            | ((x > WORLD_MIN) << 2)
+            | ((x < WORLD_MAX) << 3)
+            | ((z < WORLD_MAX) << 4)
+            | ((z > WORLD_MIN) << 5)
+        )
+
+    def move(self, axis: int, delta: int) -> bool:
+        """
+        Move one step along an axis if the result stays within bounds
+
+        Args:
+            axis (int): Axis index (AXIS_X, AXIS_Y or AXIS_Z)
+            delta (int): Signed step size
+
+        Returns:
+            bool: True if the move was performed, False if out of bounds
+        """
+        new = self._pos[axis] + delta
+        # WORLD_MIN is 0, so a single chained compare covers both bounds
+        if WORLD_MIN <= new <= WORLD_MAX:
+            self._pos[axis] = new
+            self._update_move_mask()
             return True
         return False
-    
+
+    def can_move(self, axis: int, delta: int) -> bool:
+        """Check whether a one-step move along an axis stays within bounds"""
+        return WORLD_MIN <= self._pos[axis] + delta <= WORLD_MAX
+
+    def move_up(self):
+        """Move up (increase Y coordinate)"""
+        return self.move(AXIS_Y, 1)
+
     def move_down(self):
         """Move down (decrease Y coordinate)"""
-        if self.y > WORLD_MIN:
-            self.y -= 1
-            return True
-        return False
-    
+        return self.move(AXIS_Y, -1)
+
     def move_left(self):
         """Move left (decrease X coordinate)"""
-        if self.x > WORLD_MIN:
-            self.x -= 1
-            return True
-        return False
-    
+        return self.move(AXIS_X, -1)
+
     def move_right(self):
         """Move right (increase X coordinate)"""
-        if self.x < WORLD_MAX:
-            self.x += 1
-            return True
-        return False
-    
+        return self.move(AXIS_X, 1)
+
     def move_forward(self):
         """Move forward (increase Z coordinate)"""
-        if self.z < WORLD_MAX:
-            self.z += 1
-            return True
-        return False
-    
+        return self.move(AXIS_Z, 1)
+
     def move_backward(self):
         """Move backward (decrease Z coordinate)"""
-        if self.z > WORLD_MIN:
-            self.z -= 1
-            return True
-        return False
-    
+        return self.move(AXIS_Z, -1)
+
     def can_move_up(self):
         """Check if character can move up"""
-        return self.y < WORLD_MAX
-    
+        return bool(self._move_mask & 1)
+
     def can_move_down(self):
         """Check if character can move down"""
-        return self.y > WORLD_MIN
-    
+        return bool(self._move_mask & 2)
+
     def can_move_left(self):
         """Check if character can move left"""
-        return self.x > WORLD_MIN
-    
+        return bool(self._move_mask & 4)
+
     def can_move_right(self):
         """Check if character can move right"""
-        return self.x < WORLD_MAX
-    
+        return bool(self._move_mask & 8)
+
     def can_move_forward(self):
         """Check if character can move forward"""
-        return self.z < WORLD_MAX
-    
+        return bool(self._move_mask & 16)
+
     def can_move_backward(self):
         """Check if character can move backward"""
-        return self.z > WORLD_MIN
+        return bool(self._move_mask & 32)
     
-    def get_distance_from_center(self):
+    # The kernel is bound as a default argument so each call loads it from
+    # the fast locals array instead of resolving a module global
+    def get_distance_from_center(self, _distance=_distance):
         """Calculate distance from world center (50, 50, 50)"""
-        center_x, center_y, center_z = 50, 50, 50
-        return ((self.x - center_x) ** 2 + (self.y - center_y) ** 2 + (self.z - center_z) ** 2) ** 0.5
-    
-    def get_distance_from_origin(self):
+        return _distance(self.x, self.y, self.z, 50, 50, 50)
+
+    def get_distance_from_origin(self, _distance=_distance):
         """Calculate distance from world origin (0, 0, 0)"""
-        return (self.x ** 2 + self.y ** 2 + self.z ** 2) ** 0.5
+        return _distance(self.x, self.y, self.z, 0, 0, 0)
     
     def __str__(self):
         """String representation of character position"""
         return f"Character at position ({self.x}, {self.y}, {self.z})"
-    
+
+    def __repr__(self):
+        """Detailed string representation"""
+        return f"Character(x={self.x}, y={self.y}, z={self.z})"
+
+
+class CharacterBatch:
+    """Vectorized position tracking for simulating many characters at once
+
+    Positions are held in a single (N, 3) int8 array so that movement and
+    distance queries run as NumPy array operations across all characters
+    instead of per-character Python branches.
+    """
+
+    # Axis indices into the position array
+    AXIS_X = 0
+    AXIS_Y = 1
+    AXIS_Z = 2
+
+    def __init__(self, positions=None, count=1):
+        """
+        Initialize batch of character positions
+
+        Args:
+            positions (sequence): Iterable of (x, y, z) tuples. Defaults to
+                `count` copies of STARTING_POSITION.
+            count (int): Number of characters when positions is not given.
+        """
+        if positions is None:
+            positions = [STARTING_POSITION] * count
+
+        self.pos = np.array(positions, dtype=np.int8)
+        if self.pos.ndim != 2 or self.pos.shape[1] != 3:
+            raise ValueError("positions must be a sequence of (x, y, z) tuples")
+        if ((self.pos < WORLD_MIN) | (self.pos > WORLD_MAX)).any():
+            raise ValueError(f"positions must be within bounds [{WORLD_MIN}, {WORLD_MAX}]")
+
+    def __len__(self):
+        """Number of characters in the batch"""
+        return self.pos.shape[0]
+
+    def can_move(self, axis: int, delta: int):
+        """
+        Check which characters can move along an axis
+
+        Args:
+            axis (int): Axis index (AXIS_X, AXIS_Y or AXIS_Z)
+            delta (int): Signed step size
+
+        Returns:
+            numpy.ndarray: Boolean mask of characters that can move
+        """
+        new = self.pos[:, axis].astype(np.int16) + delta
+        return (new >= WORLD_MIN) & (new <= WORLD_MAX)
+
+    def move(self, axis: int, delta: int, mask=None):
+        """
+        Move all characters along an axis, respecting world bounds
+
+        Args:
+            axis (int): Axis index (AXIS_X, AXIS_Y or AXIS_Z)
+            delta (int): Signed step size
+            mask (numpy.ndarray, optional): Boolean mask limiting which
+                characters attempt the move
+
+        Returns:
+            numpy.ndarray: Boolean mask of characters that actually moved
+        """
+        moved = self.can_move(axis, delta)
+        if mask is not None:
+            moved &= mask
+
+        np.add(self.pos[:, axis], delta, out=self.pos[:, axis],
+               where=moved, casting='unsafe')
+        return moved
+
+    def get_distance_from_center(self):
+        """Calculate distance from world center (50, 50, 50) for each character"""
+        return _distances(self.pos.astype(np.float64), 50, 50, 50)
+
+    def get_distance_from_origin(self):
+        """Calculate distance from world origin (0, 0, 0) for each character"""
+        return _distances(self.pos.astype(np.float64), 0, 0, 0)
+
     def __repr__(self):
         """Detailed string representation"""
-        return f"Character(x={self.x}, y={self.y}, z={self.z})"
+        return f"CharacterBatch(count={len(self)})"
@@ -3,7 +3,7 @@ Unit tests for character movement and position tracking
 """
 
 import pytest
-from game.character import Character
+from game.character import Character, CharacterBatch
 from config import STARTING_POSITION, WORLD_MIN, WORLD_MAX
 
 
@@ -209,4 +209,58 @@ class TestCharacter:
         
         # Test edge cases
         char = Character((WORLD_MIN, WORLD_MAX, 50))
-        assert char.position == (WORLD_MIN, WORLD_MAX, 50)
+        assert char.position == (WORLD_MIN, WORLD_MAX, 50)
+
+
+class TestCharacterBatch:
+    """Test cases for CharacterBatch class"""
+    
+    def test_batch_initialization_default(self):
+        """Test batch initialization with default positions"""
+        batch = CharacterBatch(count=4)
+        assert len(batch) == 4
+        assert tuple(batch.pos[0]) == STARTING_POSITION
+    
+    def test_batch_initialization_custom(self):
+        """Test batch initialization with custom positions"""
+        batch = CharacterBatch([(10, 20, 30), (40, 50, 60)])
+        assert len(batch) == 2
+        assert tuple(batch.pos[1]) == (40, 50, 60)
+    
+    def test_batch_initialization_invalid(self):
+        """Test batch initialization with out-of-bounds positions"""
+        with pytest.raises(ValueError):
+            CharacterBatch([(WORLD_MAX + 1, 50, 50)])
+    
+    def test_batch_move(self):
+        """Test vectorized movement along one axis"""
+        batch = CharacterBatch([(50, 50, 50), (50, WORLD_MAX, 50)])
+        
+        moved = batch.move(CharacterBatch.AXIS_Y, 1)
+        
+        # First character moves, second is clamped at the boundary
+        assert list(moved) == [True, False]
+        assert tuple(batch.pos[0]) == (50, 51, 50)
+        assert tuple(batch.pos[1]) == (50, WORLD_MAX, 50)
+    
+    def test_batch_move_with_mask(self):
+        """Test movement restricted by a caller-provided mask"""
+        batch = CharacterBatch(count=2)
+        
+        mask = batch.can_move(CharacterBatch.AXIS_X, 1)
+        mask[1] = False
+        moved = batch.move(CharacterBatch.AXIS_X, 1, mask=mask)
+        
+        assert list(moved) == [True, False]
+        assert tuple(batch.pos[0]) == (51, 50, 50)
+        assert tuple(batch.pos[1]) == STARTING_POSITION
+    
+    def test_batch_distances(self):
+        """Test vectorized distance calculations"""
+        batch = CharacterBatch([(50, 50, 50), (3, 4, 0)])
+        
+        center_distances = batch.get_distance_from_center()
+        assert center_distances[0] == 0.0
+        
+        origin_distances = batch.get_distance_from_origin()
+        assert origin_distances[1] == 5.0
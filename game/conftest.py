@@ -0,0 +1,54 @@
+"""
+Shared pytest fixtures for the game test modules
+"""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from game.openai_client import OpenAIClient
+
+
+@pytest.fixture(scope="session")
+def _openai_sdk_patch():
+    """Patch the OpenAI SDK class once per session
+
+    Entering and exiting a patch context for every test adds measurable
+    setup time across the suite; the SDK class never needs re-patching,
+    only the mock client's per-test state does.
+    """
+    with patch('game.openai_client.OpenAI') as mock_openai:
+        yield mock_openai
+
+
+@pytest.fixture
+def mock_openai_client(_openai_sdk_patch):
+    """Create a mock OpenAI client for testing
+
+    The underlying mock is shared for the whole session (see
+    _openai_sdk_patch), so it is reset here to keep per-test return
+    values and side effects from leaking between tests.
+    """
+    mock_client = _openai_sdk_patch.return_value
+    mock_client.reset_mock(return_value=True, side_effect=True)
+    mock_client.chat.completions.create.side_effect = None
+    return mock_client
+
+
+@pytest.fixture
+def openai_client(mock_openai_client):
+    """Create OpenAIClient instance with mocked OpenAI"""
+    return OpenAIClient(api_key="test-api-key")
+
+
+@pytest.fixture
+def make_chat_response():
+    """Build a chat-completion response stub with the given content
+
+    SimpleNamespace is much cheaper to construct than Mock and cannot
+    silently auto-create attributes a real SDK response would not have.
+    """
+    def _make(text):
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+    return _make
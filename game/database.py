@@ -4,98 +4,398 @@ Database operations for cube persistence in Cyberpunk Exploration Game
 
 import sqlite3
 import json
-from datetime import datetime
-from typing import Optional, Dict, Any, List, Tuple
-from config import DATABASE_FILE
+import queue
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Iterator, Optional, Dict, Any, List, Tuple
+
+import numpy as np
+
+from config import DATABASE_FILE, WORLD_SIZE
+
+try:
+    # orjson's C encoder/decoder is several times faster than stdlib json
+    # on the metadata hot path; fall back to the stdlib when unavailable.
+    # orjson.dumps returns bytes, which sqlite3 stores directly (as a
+    # BLOB) without a UTF-8 decode/encode round trip, and orjson.loads
+    # accepts bytes or str so rows written either way read back fine.
+    import orjson
+
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    _dumps = json.dumps
+    _loads = json.loads
+
+# Pre-bound at module scope so the write hot path skips the attribute
+# lookup on the time module per call
+_time_ns = time.time_ns
+
+# Sentinel distinguishing "not cached" from a cached negative lookup
+_MISSING = object()
+
+# Structured dtype for column-oriented region reads; world coordinates
+# (0-99) fit comfortably in a signed byte
+_COORD_DTYPE = np.dtype([('x', 'i1'), ('y', 'i1'), ('z', 'i1')])
+
+
+class _LazyMetadata:
+    """Sequence view over raw metadata strings, JSON-decoded only on access"""
+
+    __slots__ = ('_raw',)
+
+    def __init__(self, raw: List[Optional[str]]):
+        self._raw = raw
+
+    def __len__(self):
+        return len(self._raw)
+
+    def __getitem__(self, index):
+        raw = self._raw[index]
+        return _loads(raw) if raw else None
 
 
 class DatabaseManager:
     """Manages SQLite database operations for cube data persistence"""
-    
-    def __init__(self, db_file: str = DATABASE_FILE):
+
+    # key is the packed (x, y, z) coordinate (see _pack_key); making it the
+    # INTEGER PRIMARY KEY aliases SQLite's rowid, so point lookups become a
+    # single B-tree probe and no hidden rowid column is stored
+    _CREATE_CUBE_DATA = '''
+        CREATE TABLE IF NOT EXISTS cube_data (
+            key INTEGER PRIMARY KEY,
+            x INTEGER NOT NULL,
+            y INTEGER NOT NULL,
+            z INTEGER NOT NULL,
+            description TEXT NOT NULL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            metadata TEXT
+        )
+    '''
+
+    # Maximum number of point lookups kept in the read cache
+    _CACHE_MAX = 4096
+
+    # Hot-path SQL is kept as class-level constants so every call reuses
+    # the same statement-cache entry instead of rebuilding the literal.
+    # The upsert updates a conflicting row in place; INSERT OR REPLACE
+    # would delete and reinsert it, churning every index on the table.
+    # SQLite gained ON CONFLICT ... DO UPDATE in 3.24 (2018).
+    if sqlite3.sqlite_version_info >= (3, 24, 0):
+        _SQL_INSERT = '''
+            INSERT INTO cube_data
+            (key, x, y, z, description, timestamp, metadata)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                description = excluded.description,
+                timestamp = excluded.timestamp,
+                metadata = excluded.metadata
+        '''
+    else:
+        _SQL_INSERT = '''
+            INSERT OR REPLACE INTO cube_data
+            (key, x, y, z, description, timestamp, metadata)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        '''
+    _SQL_SELECT_ONE = '''
+        SELECT x, y, z, description, timestamp, metadata
+        FROM cube_data
+        WHERE key = ?
+    '''
+    _SQL_EXISTS = 'SELECT 1 FROM cube_data WHERE key = ? LIMIT 1'
+    # RETURNING (SQLite >= 3.35) fuses the deleted-row check into the
+    # DELETE itself; older libraries fall back to cursor.rowcount
+    _SQL_DELETE_RETURNING = 'DELETE FROM cube_data WHERE key = ? RETURNING 1'
+    _SQL_DELETE = 'DELETE FROM cube_data WHERE key = ?'
+    _HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+    _SQL_RANGE = '''
+        SELECT x, y, z, description, timestamp, metadata
+        FROM cube_data
+        WHERE key BETWEEN ? AND ?
+    '''
+
+    # Maximum queued rows the writer thread folds into one transaction
+    _WRITE_BATCH_MAX = 256
+
+    # Regions spanning at most this many (x, y) columns are fetched as
+    # per-column packed-key range scans instead of one box predicate
+    _RANGE_SCAN_MAX_COLUMNS = 64
+
+    def __init__(self, db_file: str = DATABASE_FILE, fast: bool = True):
         """
         Initialize database manager
-        
+
         Args:
             db_file (str): Path to SQLite database file
+            fast (bool): Apply the performance PRAGMAs (WAL, relaxed
+                synchronous, memory temp store, mmap). Disable to run on
+                stock SQLite settings, e.g. for durability comparisons.
         """
         self.db_file = db_file
         self.connection = None
+        self._fast = fast
+        # Bounded LRU over point lookups: successive context queries around
+        # the player's position re-read almost the same 3x3x3 neighborhood,
+        # so most reads never need to touch SQLite. Misses are cached as
+        # None so repeated negative probes are also free.
+        self._read_cache: "OrderedDict[Tuple[int, int, int], Optional[Dict[str, Any]]]" = OrderedDict()
+        # Writes are handed to a single background thread so the caller
+        # never blocks on a commit (and its fsync). The lock serializes
+        # all SQL on the shared connection; reads drain the queue first
+        # (see _drain_writes) so read-your-writes semantics hold.
+        self._write_queue: "queue.Queue[Tuple]" = queue.Queue()
+        self._sql_lock = threading.Lock()
+        self._writer_thread = None
         self._initialize_database()
+        self._writer_thread = threading.Thread(
+            target=self._writer_loop, daemon=True,
+            name=f"db-writer-{id(self):x}")
+        self._writer_thread.start()
     
     def _initialize_database(self):
         """Initialize database connection and create tables if they don't exist"""
         try:
-            self.connection = sqlite3.connect(self.db_file)
-            self.connection.row_factory = sqlite3.Row  # Enable column access by name
+            # isolation_level=None puts sqlite3 in autocommit mode so the
+            # module stops wrapping every DML statement in an implicit
+            # transaction; multi-statement transactions use explicit BEGIN
+            # check_same_thread=False lets the background writer thread
+            # share this connection; the sql lock provides the actual
+            # mutual exclusion
+            self.connection = sqlite3.connect(self.db_file, isolation_level=None,
+                                               cached_statements=256,
+                                               check_same_thread=False)
+            # Default tuple rows: positional indexing skips sqlite3.Row's
+            # per-column name lookup in the tight read loops below
+            if self._fast:
+                self._configure_connection()
             self._create_tables()
+            self._load_presence_bitset()
+            # One long-lived cursor for the hot paths; callers must not
+            # interleave iteration of its results across method calls.
+            # The writer thread gets its own cursor.
+            self._cursor = self.connection.cursor()
+            self._write_cursor = self.connection.cursor()
+            # Guarantees the file descriptor is released even if a caller
+            # never reaches close(); weakref.finalize also runs at
+            # interpreter exit, unlike __del__, and close() detaches it
+            self._finalizer = weakref.finalize(self, self.connection.close)
         except sqlite3.Error as e:
             raise DatabaseError(f"Failed to initialize database: {e}")
+
+    def _configure_connection(self):
+        """Apply performance PRAGMAs once per connection"""
+        # WAL lets readers run during writes and turns each commit into a
+        # sequential log append instead of a full journal + fsync cycle
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA temp_store=MEMORY")
+        self.connection.execute("PRAGMA cache_size=-65536")   # 64 MiB page cache
+        self.connection.execute("PRAGMA mmap_size=268435456")  # 256 MiB
     
     def _create_tables(self):
         """Create database tables if they don't exist"""
         cursor = self.connection.cursor()
-        
+
+        self._migrate_legacy_schema(cursor)
+
         # Create cube_data table
+        cursor.execute(self._CREATE_CUBE_DATA)
+
+        # The packed key serves point lookups and small-region range scans
+        # directly; the old coordinate index only duplicated it, doubling
+        # write amplification, so existing databases drop it here
+        cursor.execute('DROP INDEX IF EXISTS idx_cube_coordinates')
+
+        # Composite index for large box queries that fall through to the
+        # three-predicate path: the planner range-prunes on x and the
+        # remaining filter runs entirely inside the index
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS cube_data (
-                x INTEGER NOT NULL,
-                y INTEGER NOT NULL,
-                z INTEGER NOT NULL,
-                description TEXT NOT NULL,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                metadata TEXT,
-                PRIMARY KEY (x, y, z)
-            )
-        ''')
-        
-        # Create index for faster queries
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_cube_coordinates 
+            CREATE INDEX IF NOT EXISTS idx_cube_xyz
             ON cube_data (x, y, z)
         ''')
-        
+
         # Create index for timestamp queries
         cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_cube_timestamp 
+            CREATE INDEX IF NOT EXISTS idx_cube_timestamp
             ON cube_data (timestamp)
         ''')
-        
+
         self.connection.commit()
+
+    def _load_presence_bitset(self):
+        """Seed the in-memory presence bookkeeping from existing rows
+
+        One bit per world coordinate (125 KB for the 100^3 world) answers
+        cube_exists exactly without any SQL round-trip. The same scan
+        collects out-of-world coordinates into a side set and seeds the
+        O(1) row counter behind get_total_cubes.
+        """
+        size = WORLD_SIZE
+        present = bytearray(size * size * size // 8 + 1)
+        outside = set()
+        count = 0
+        for x, y, z in self.connection.execute("SELECT x, y, z FROM cube_data"):
+            count += 1
+            if 0 <= x < size and 0 <= y < size and 0 <= z < size:
+                idx = (x * size + y) * size + z
+                present[idx >> 3] |= 1 << (idx & 7)
+            else:
+                outside.add((x, y, z))
+        self._present = present
+        self._outside = outside
+        self._count = count
+
+    @staticmethod
+    def _in_world(x: int, y: int, z: int) -> bool:
+        """Check whether coordinates fall inside the tracked world cube"""
+        return (0 <= x < WORLD_SIZE and 0 <= y < WORLD_SIZE
+                and 0 <= z < WORLD_SIZE)
+
+    def _migrate_legacy_schema(self, cursor):
+        """Rebuild cube_data in place if it predates the packed-key schema"""
+        columns = [row[1] for row in cursor.execute("PRAGMA table_info(cube_data)")]
+        if not columns or 'key' in columns:
+            return
+
+        cursor.execute("BEGIN")
+        cursor.execute("ALTER TABLE cube_data RENAME TO cube_data_legacy")
+        cursor.execute(self._CREATE_CUBE_DATA)
+        # Legacy rows stored ISO-8601 TEXT timestamps while new writes use
+        # integer epoch nanoseconds, and SQLite orders TEXT above INTEGER:
+        # copied verbatim, migrated rows would sort as newest forever. So
+        # convert TEXT timestamps to epoch ns here; unparsable values fall
+        # back to 0 (oldest) rather than poisoning the sort order.
+        cursor.execute('''
+            INSERT INTO cube_data (key, x, y, z, description, timestamp, metadata)
+            SELECT (x << 14) + (y << 7) + z, x, y, z, description,
+                   CASE WHEN typeof(timestamp) = 'text'
+                        THEN COALESCE(CAST(strftime('%s', timestamp) AS INTEGER)
+                                      * 1000000000, 0)
+                        ELSE timestamp END,
+                   metadata
+            FROM cube_data_legacy
+        ''')
+        cursor.execute("DROP TABLE cube_data_legacy")
+        self.connection.commit()
+
+    def _writer_loop(self):
+        """Drain queued rows into batched transactions on the writer thread
+
+        Blocks on the queue, then greedily gathers whatever else is already
+        pending (up to _WRITE_BATCH_MAX rows) so a burst of writes pays for
+        a single commit and fsync instead of one per row.
+        """
+        get_nowait = self._write_queue.get_nowait
+        task_done = self._write_queue.task_done
+        while True:
+            batch = [self._write_queue.get()]
+            while len(batch) < self._WRITE_BATCH_MAX:
+                try:
+                    batch.append(get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self._sql_lock:
+                    if not self.connection.in_transaction:
+                        self._write_cursor.execute("BEGIN")
+                    self._write_cursor.executemany(self._SQL_INSERT, batch)
+                    self.connection.commit()
+            except sqlite3.Error as e:
+                print(f"Warning: background cube write failed: {e}")
+            finally:
+                for _ in batch:
+                    task_done()
+
+    def _drain_writes(self):
+        """Block until every queued write has been committed
+
+        Called at the top of each read path so readers on the game thread
+        always observe their own preceding writes.
+        """
+        self._write_queue.join()
+
+    # World coordinates fit in 7 bits per axis, so (x, y, z) packs into one
+    # 21-bit integer key. Addition (rather than bitwise OR) keeps slightly
+    # out-of-range coordinates, e.g. small negatives, distinct as well.
+    @staticmethod
+    def _pack_key(x: int, y: int, z: int) -> int:
+        """Pack (x, y, z) coordinates into a single integer key"""
+        return (x << 14) + (y << 7) + z
+
+    @staticmethod
+    def _unpack_key(key: int) -> Tuple[int, int, int]:
+        """Unpack an in-range integer key back into (x, y, z) coordinates"""
+        return key >> 14, (key >> 7) & 0x7F, key & 0x7F
     
-    def store_cube_description(self, x: int, y: int, z: int, description: str, 
+    def store_cube_description(self, x: int, y: int, z: int, description: str,
                               metadata: Optional[Dict[str, Any]] = None) -> bool:
         """
         Store cube description with coordinates as primary key
-        
+
         Args:
             x (int): X coordinate
-            y (int): Y coordinate  
+            y (int): Y coordinate
             z (int): Z coordinate
             description (str): Description of the cube location
             metadata (dict, optional): Additional metadata as JSON
-            
+
         Returns:
             bool: True if successful, False otherwise
         """
-        try:
-            cursor = self.connection.cursor()
-            
-            # Convert metadata to JSON string if provided
-            metadata_json = json.dumps(metadata) if metadata else None
-            
-            # Use INSERT OR REPLACE to handle primary key conflicts
-            cursor.execute('''
-                INSERT OR REPLACE INTO cube_data 
-                (x, y, z, description, timestamp, metadata)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (x, y, z, description, datetime.now().isoformat(), metadata_json))
-            
-            self.connection.commit()
-            return True
-            
-        except sqlite3.Error as e:
-            raise DatabaseError(f"Failed to store cube description: {e}")
+        return self.store_cube_descriptions([(x, y, z, description, metadata)]) == 1
+
+    def store_cube_descriptions(self, rows: List[Tuple]) -> int:
+        """
+        Queue multiple cube descriptions for the background writer
+
+        The rows are serialized here, handed to the writer thread and
+        committed in batched transactions off the game loop, so callers
+        never wait on a disk fsync. Presence bits and cache invalidation
+        happen synchronously, and every read path drains the queue first,
+        so the write is observable as soon as this method returns.
+
+        Args:
+            rows (list): Tuples of (x, y, z, description, metadata)
+
+        Returns:
+            int: Number of rows queued
+        """
+        # Pre-serialize metadata and share one timestamp across the
+        # batch. Epoch nanoseconds keep inserts orderable at full
+        # resolution without allocating a datetime plus a formatted
+        # string per row.
+        timestamp = _time_ns()
+        prepared = [
+            (self._pack_key(x, y, z), x, y, z, description, timestamp,
+             _dumps(metadata) if metadata else None)
+            for x, y, z, description, metadata in rows
+        ]
+
+        # Invalidate cached point lookups, mark presence bits and bump the
+        # row counter before the rows are queued so existence and count
+        # queries are immediately correct. A write only counts as new when
+        # its presence bit (or out-of-world set entry) was clear.
+        for row in prepared:
+            x, y, z = row[1], row[2], row[3]
+            self._read_cache.pop((x, y, z), None)
+            if self._in_world(x, y, z):
+                idx = (x * WORLD_SIZE + y) * WORLD_SIZE + z
+                mask = 1 << (idx & 7)
+                if not self._present[idx >> 3] & mask:
+                    self._present[idx >> 3] |= mask
+                    self._count += 1
+            elif (x, y, z) not in self._outside:
+                self._outside.add((x, y, z))
+                self._count += 1
+
+        put = self._write_queue.put
+        for row in prepared:
+            put(row)
+
+        return len(prepared)
     
     def get_cube_description(self, x: int, y: int, z: int) -> Optional[Dict[str, Any]]:
         """
@@ -109,30 +409,92 @@ class DatabaseManager:
         Returns:
             dict: Cube data with description, timestamp, and metadata, or None if not found
         """
+        cache_key = (x, y, z)
+        cached = self._read_cache.get(cache_key, _MISSING)
+        if cached is not _MISSING:
+            self._read_cache.move_to_end(cache_key)
+            return cached
+
         try:
-            cursor = self.connection.cursor()
-            
-            cursor.execute('''
-                SELECT x, y, z, description, timestamp, metadata
-                FROM cube_data
-                WHERE x = ? AND y = ? AND z = ?
-            ''', (x, y, z))
-            
-            row = cursor.fetchone()
+            self._drain_writes()
+            with self._sql_lock:
+                self._cursor.execute(self._SQL_SELECT_ONE,
+                                     (self._pack_key(x, y, z),))
+                row = self._cursor.fetchone()
+            result = None
             if row:
+                rx, ry, rz, description, timestamp, metadata = row
                 result = {
-                    'x': row['x'],
-                    'y': row['y'], 
-                    'z': row['z'],
-                    'description': row['description'],
-                    'timestamp': row['timestamp'],
-                    'metadata': json.loads(row['metadata']) if row['metadata'] else None
+                    'x': rx,
+                    'y': ry,
+                    'z': rz,
+                    'description': description,
+                    'timestamp': timestamp,
+                    'metadata': _loads(metadata) if metadata else None
                 }
-                return result
-            return None
-            
+
+            self._cache_store(cache_key, result)
+            return result
+
         except sqlite3.Error as e:
             raise DatabaseError(f"Failed to retrieve cube description: {e}")
+
+    def get_cube_descriptions(self, coords) -> Dict[Tuple[int, int, int], Dict[str, Any]]:
+        """
+        Retrieve many cubes by coordinate in a single query
+
+        One `key IN (...)` probe replaces a round-trip per coordinate,
+        which matters for the 27-cube context window read every step.
+        Coordinates without a stored cube are simply absent from the
+        result; all looked-up points (hits and misses) land in the read
+        cache.
+
+        Args:
+            coords (iterable): (x, y, z) coordinate tuples
+
+        Returns:
+            dict: Mapping of (x, y, z) to cube data dictionaries
+        """
+        coords = list(coords)
+        if not coords:
+            return {}
+
+        try:
+            self._drain_writes()
+            keys = [self._pack_key(x, y, z) for x, y, z in coords]
+            with self._sql_lock:
+                self._cursor.execute(
+                    'SELECT x, y, z, description, timestamp, metadata '
+                    f'FROM cube_data WHERE key IN ({",".join("?" * len(keys))})',
+                    keys)
+                rows = self._cursor.fetchall()
+
+            results = {}
+            for rx, ry, rz, description, timestamp, metadata in rows:
+                results[(rx, ry, rz)] = {
+                    'x': rx,
+                    'y': ry,
+                    'z': rz,
+                    'description': description,
+                    'timestamp': timestamp,
+                    'metadata': _loads(metadata) if metadata else None
+                }
+
+            for coord in coords:
+                self._cache_store(coord, results.get(coord))
+
+            return results
+
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to retrieve cube descriptions: {e}")
+
+    def _cache_store(self, cache_key: Tuple[int, int, int],
+                     result: Optional[Dict[str, Any]]):
+        """Insert a point-lookup result into the LRU cache, evicting oldest"""
+        self._read_cache[cache_key] = result
+        self._read_cache.move_to_end(cache_key)
+        if len(self._read_cache) > self._CACHE_MAX:
+            self._read_cache.popitem(last=False)
     
     def get_cubes_in_region(self, min_x: int, min_y: int, min_z: int,
                            max_x: int, max_y: int, max_z: int) -> List[Dict[str, Any]]:
@@ -147,34 +509,220 @@ class DatabaseManager:
             list: List of cube data dictionaries
         """
         try:
-            cursor = self.connection.cursor()
-            
-            cursor.execute('''
-                SELECT x, y, z, description, timestamp, metadata
-                FROM cube_data
-                WHERE x >= ? AND x <= ? 
-                  AND y >= ? AND y <= ?
-                  AND z >= ? AND z <= ?
-                ORDER BY x, y, z
-            ''', (min_x, max_x, min_y, max_y, min_z, max_z))
-            
+            self._drain_writes()
+            columns = (max_x - min_x + 1) * (max_y - min_y + 1)
+            with self._sql_lock:
+                if (0 < columns <= self._RANGE_SCAN_MAX_COLUMNS
+                        and self._in_world(min_x, min_y, min_z)
+                        and self._in_world(max_x, max_y, max_z)):
+                    # Small in-world box: cubes sharing (x, y) occupy one
+                    # contiguous packed-key range, so the box becomes a few
+                    # sequential B-tree range scans on the primary key.
+                    # Key order equals (x, y, z) order, so iterating the
+                    # columns in order keeps the result sorted.
+                    rows = []
+                    for x in range(min_x, max_x + 1):
+                        for y in range(min_y, max_y + 1):
+                            self._cursor.execute(
+                                self._SQL_RANGE,
+                                (self._pack_key(x, y, min_z),
+                                 self._pack_key(x, y, max_z)))
+                            rows.extend(self._cursor.fetchall())
+                else:
+                    self._cursor.execute('''
+                        SELECT x, y, z, description, timestamp, metadata
+                        FROM cube_data
+                        WHERE x >= ? AND x <= ?
+                          AND y >= ? AND y <= ?
+                          AND z >= ? AND z <= ?
+                        ORDER BY x, y, z
+                    ''', (min_x, max_x, min_y, max_y, min_z, max_z))
+                    rows = self._cursor.fetchall()
+
             results = []
-            for row in cursor.fetchall():
-                result = {
-                    'x': row['x'],
-                    'y': row['y'],
-                    'z': row['z'], 
-                    'description': row['description'],
-                    'timestamp': row['timestamp'],
-                    'metadata': json.loads(row['metadata']) if row['metadata'] else None
-                }
-                results.append(result)
+            for rx, ry, rz, description, timestamp, metadata in rows:
+                results.append({
+                    'x': rx,
+                    'y': ry,
+                    'z': rz,
+                    'description': description,
+                    'timestamp': timestamp,
+                    'metadata': _loads(metadata) if metadata else None
+                })
             
             return results
             
         except sqlite3.Error as e:
             raise DatabaseError(f"Failed to retrieve cubes in region: {e}")
     
+    def get_region_index(self, min_x: int, min_y: int, min_z: int,
+                         max_x: int, max_y: int, max_z: int) -> Dict[Tuple[int, int, int], Dict[str, Any]]:
+        """
+        Get all cubes in a 3D region indexed by coordinate
+
+        One region fetch that consumers can probe with O(1) membership
+        tests, instead of issuing an existence query per coordinate.
+
+        Args:
+            min_x, min_y, min_z (int): Minimum coordinates
+            max_x, max_y, max_z (int): Maximum coordinates
+
+        Returns:
+            dict: Mapping of (x, y, z) to cube data dictionaries
+        """
+        return {
+            (cube['x'], cube['y'], cube['z']): cube
+            for cube in self.get_cubes_in_region(min_x, min_y, min_z,
+                                                 max_x, max_y, max_z)
+        }
+
+    def get_context(self, x: int, y: int, z: int) -> List[Dict[str, Any]]:
+        """
+        Get the 3x3x3 neighborhood around a position, clamped to the world
+
+        Convenience wrapper for the per-step context window; the radius-1
+        box always takes the packed-key range-scan path (at most nine tiny
+        primary-key range scans).
+
+        Args:
+            x, y, z (int): Center coordinates
+
+        Returns:
+            list: List of cube data dictionaries
+        """
+        return self.get_cubes_in_region(
+            max(x - 1, 0), max(y - 1, 0), max(z - 1, 0),
+            min(x + 1, WORLD_SIZE - 1), min(y + 1, WORLD_SIZE - 1),
+            min(z + 1, WORLD_SIZE - 1))
+
+    def get_cubes_in_region_arrays(self, min_x: int, min_y: int, min_z: int,
+                                   max_x: int, max_y: int, max_z: int):
+        """
+        Get cubes in a 3D region as column-oriented arrays
+
+        Unlike get_cubes_in_region, this builds no per-row dicts: the
+        coordinates land in one NumPy structured array, descriptions in a
+        plain list, and metadata JSON is only decoded when an entry is
+        actually indexed. Intended for numeric consumers (e.g. a minimap)
+        reading world-range coordinates.
+
+        Args:
+            min_x, min_y, min_z (int): Minimum coordinates
+            max_x, max_y, max_z (int): Maximum coordinates
+
+        Returns:
+            tuple: (coords, descriptions, metadata) where coords is a
+                structured array with x/y/z fields, descriptions a list of
+                str and metadata a lazily-decoded sequence
+        """
+        try:
+            self._drain_writes()
+            with self._sql_lock:
+                self._cursor.execute('''
+                    SELECT x, y, z, description, metadata
+                    FROM cube_data
+                    WHERE x >= ? AND x <= ?
+                      AND y >= ? AND y <= ?
+                      AND z >= ? AND z <= ?
+                    ORDER BY x, y, z
+                ''', (min_x, max_x, min_y, max_y, min_z, max_z))
+
+                rows = self._cursor.fetchall()
+            coords = np.fromiter(((row[0], row[1], row[2]) for row in rows),
+                                 dtype=_COORD_DTYPE, count=len(rows))
+            descriptions = [row[3] for row in rows]
+            metadata = _LazyMetadata([row[4] for row in rows])
+
+            return coords, descriptions, metadata
+
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to retrieve cubes in region: {e}")
+
+    def find_invalid_cubes(self, min_coord: int, max_coord: int) -> List[Tuple]:
+        """
+        Find rows outside the coordinate bounds or with blank descriptions
+
+        The filtering runs inside SQLite, so integrity validation returns
+        only offending rows instead of scanning the whole table in Python.
+
+        Args:
+            min_coord (int): Minimum valid coordinate on every axis
+            max_coord (int): Maximum valid coordinate on every axis
+
+        Returns:
+            list: (x, y, z, description) tuples for offending rows
+        """
+        try:
+            self._drain_writes()
+            with self._sql_lock:
+                self._cursor.execute('''
+                    SELECT x, y, z, description
+                    FROM cube_data
+                    WHERE x NOT BETWEEN ? AND ?
+                       OR y NOT BETWEEN ? AND ?
+                       OR z NOT BETWEEN ? AND ?
+                       OR description IS NULL
+                       OR trim(description) = ''
+                ''', (min_coord, max_coord) * 3)
+                return self._cursor.fetchall()
+
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to find invalid cubes: {e}")
+
+    def count_cubes_exact(self) -> int:
+        """
+        Count stored cubes with COUNT(*), bypassing the in-memory counter
+
+        Intended for integrity checks, which should not trust bookkeeping
+        that writes through this class maintain.
+
+        Returns:
+            int: Total number of rows in cube_data
+        """
+        try:
+            self._drain_writes()
+            with self._sql_lock:
+                self._cursor.execute('SELECT COUNT(*) FROM cube_data')
+                return self._cursor.fetchone()[0]
+
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to count cubes: {e}")
+
+    def iter_all_cubes(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over every stored cube without materializing the table
+
+        Rows are pulled from the cursor in fixed-size batches, so a full
+        export keeps O(batch) rows resident instead of one dict per cube
+        for the whole world.
+
+        Yields:
+            dict: Cube data dictionaries ordered by (x, y, z)
+        """
+        self._drain_writes()
+        cursor = self.connection.cursor()
+        with self._sql_lock:
+            cursor.execute('''
+                SELECT x, y, z, description, timestamp, metadata
+                FROM cube_data
+                ORDER BY x, y, z
+            ''')
+
+        while True:
+            with self._sql_lock:
+                rows = cursor.fetchmany(1024)
+            if not rows:
+                return
+            for rx, ry, rz, description, timestamp, metadata in rows:
+                yield {
+                    'x': rx,
+                    'y': ry,
+                    'z': rz,
+                    'description': description,
+                    'timestamp': timestamp,
+                    'metadata': _loads(metadata) if metadata else None
+                }
+
     def cube_exists(self, x: int, y: int, z: int) -> bool:
         """
         Check if a cube exists in the database
@@ -185,19 +733,14 @@ class DatabaseManager:
         Returns:
             bool: True if cube exists, False otherwise
         """
-        try:
-            cursor = self.connection.cursor()
-            
-            cursor.execute('''
-                SELECT 1 FROM cube_data
-                WHERE x = ? AND y = ? AND z = ?
-                LIMIT 1
-            ''', (x, y, z))
-            
-            return cursor.fetchone() is not None
-            
-        except sqlite3.Error as e:
-            raise DatabaseError(f"Failed to check cube existence: {e}")
+        if self._in_world(x, y, z):
+            # Exact in-memory answer: one bit test, no SQL round-trip
+            idx = (x * WORLD_SIZE + y) * WORLD_SIZE + z
+            return bool((self._present[idx >> 3] >> (idx & 7)) & 1)
+
+        # Out-of-world coordinates live in the side set kept in lockstep
+        # with the bitset, so no query is needed for them either
+        return (x, y, z) in self._outside
     
     def get_total_cubes(self) -> int:
         """
@@ -206,13 +749,9 @@ class DatabaseManager:
         Returns:
             int: Total number of cubes
         """
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute('SELECT COUNT(*) FROM cube_data')
-            return cursor.fetchone()[0]
-            
-        except sqlite3.Error as e:
-            raise DatabaseError(f"Failed to get total cubes: {e}")
+        # Maintained incrementally on store/delete/clear, so this is an
+        # O(1) read instead of a COUNT(*) table scan
+        return self._count
     
     def get_recent_cubes(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -225,26 +764,32 @@ class DatabaseManager:
             list: List of recent cube data dictionaries
         """
         try:
-            cursor = self.connection.cursor()
-            
-            cursor.execute('''
-                SELECT x, y, z, description, timestamp, metadata
-                FROM cube_data
-                ORDER BY timestamp DESC
-                LIMIT ?
-            ''', (limit,))
-            
+            self._drain_writes()
+            with self._sql_lock:
+                # rowid aliases the packed coordinate key here, not the
+                # insertion order, so recency has to come from the
+                # timestamp column. Timestamps are integer epoch
+                # nanoseconds (cheap compares, served by
+                # idx_cube_timestamp); the key breaks ties within a batch
+                # deterministically.
+                self._cursor.execute('''
+                    SELECT x, y, z, description, timestamp, metadata
+                    FROM cube_data
+                    ORDER BY timestamp DESC, key DESC
+                    LIMIT ?
+                ''', (limit,))
+                rows = self._cursor.fetchall()
+
             results = []
-            for row in cursor.fetchall():
-                result = {
-                    'x': row['x'],
-                    'y': row['y'],
-                    'z': row['z'],
-                    'description': row['description'], 
-                    'timestamp': row['timestamp'],
-                    'metadata': json.loads(row['metadata']) if row['metadata'] else None
-                }
-                results.append(result)
+            for rx, ry, rz, description, timestamp, metadata in rows:
+                results.append({
+                    'x': rx,
+                    'y': ry,
+                    'z': rz,
+                    'description': description,
+                    'timestamp': timestamp,
+                    'metadata': _loads(metadata) if metadata else None
+                })
             
             return results
             
@@ -262,15 +807,26 @@ class DatabaseManager:
             bool: True if deleted, False if not found
         """
         try:
-            cursor = self.connection.cursor()
-            
-            cursor.execute('''
-                DELETE FROM cube_data
-                WHERE x = ? AND y = ? AND z = ?
-            ''', (x, y, z))
-            
-            self.connection.commit()
-            return cursor.rowcount > 0
+            self._drain_writes()
+            with self._sql_lock:
+                if self._HAS_RETURNING:
+                    self._cursor.execute(self._SQL_DELETE_RETURNING,
+                                         (self._pack_key(x, y, z),))
+                    deleted = self._cursor.fetchone() is not None
+                else:
+                    self._cursor.execute(self._SQL_DELETE,
+                                         (self._pack_key(x, y, z),))
+                    deleted = self._cursor.rowcount > 0
+                self.connection.commit()
+            self._read_cache.pop((x, y, z), None)
+            if deleted:
+                self._count -= 1
+                if self._in_world(x, y, z):
+                    idx = (x * WORLD_SIZE + y) * WORLD_SIZE + z
+                    self._present[idx >> 3] &= ~(1 << (idx & 7))
+                else:
+                    self._outside.discard((x, y, z))
+            return deleted
             
         except sqlite3.Error as e:
             raise DatabaseError(f"Failed to delete cube: {e}")
@@ -283,19 +839,35 @@ class DatabaseManager:
             int: Number of cubes deleted
         """
         try:
-            cursor = self.connection.cursor()
-            cursor.execute('DELETE FROM cube_data')
-            self.connection.commit()
-            return cursor.rowcount
+            self._drain_writes()
+            with self._sql_lock:
+                self._cursor.execute('DELETE FROM cube_data')
+                self.connection.commit()
+                deleted = self._cursor.rowcount
+            self._read_cache.clear()
+            self._present = bytearray(len(self._present))
+            self._outside.clear()
+            self._count = 0
+            return deleted
             
         except sqlite3.Error as e:
             raise DatabaseError(f"Failed to clear all cubes: {e}")
     
     def close(self):
-        """Close database connection"""
+        """Flush pending background writes and close the database connection
+
+        Idempotent: detaches the finalizer so the connection is not
+        closed a second time at collection.
+        """
         if self.connection:
-            self.connection.close()
-            self.connection = None
+            if self._writer_thread is not None and self._writer_thread.is_alive():
+                self._write_queue.join()
+            with self._sql_lock:
+                self._finalizer.detach()
+                self.connection.close()
+                self.connection = None
+                self._cursor = None
+                self._write_cursor = None
     
     def __enter__(self):
         """Context manager entry"""
@@ -304,12 +876,8 @@ class DatabaseManager:
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit"""
         self.close()
-    
-    def __del__(self):
-        """Destructor to ensure connection is closed"""
-        self.close()
 
 
 class DatabaseError(Exception):
     """Custom exception for database-related errors"""
-    pass
+    pass
@@ -3,8 +3,6 @@ Unit tests for database operations
 """
 
 import pytest
-import tempfile
-import os
 import json
 from datetime import datetime
 from game.database import DatabaseManager, DatabaseError
@@ -15,16 +13,16 @@ class TestDatabaseManager:
     
     @pytest.fixture
     def temp_db(self):
-        """Create a temporary database for testing"""
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.db') as tmp:
-            db_path = tmp.name
-        
-        db_manager = DatabaseManager(db_path)
+        """Create an in-memory database for testing
+
+        :memory: keeps each test's database entirely in RAM — no file
+        creation, no fsync. test_context_manager still exercises the
+        on-disk path.
+        """
+        db_manager = DatabaseManager(":memory:")
         yield db_manager
-        
-        # Cleanup
+
         db_manager.close()
-        os.unlink(db_path)
     
     def test_database_initialization(self, temp_db):
         """Test database initialization and table creation"""
@@ -85,14 +83,13 @@ class TestDatabaseManager:
         """Test retrieving cubes in a 3D region"""
         # Store multiple cubes
         cubes = [
-            (10, 10, 10, "Cube 1"),
-            (10, 11, 10, "Cube 2"),
-            (11, 10, 10, "Cube 3"),
-            (20, 20, 20, "Cube 4"),  # Outside region
+            (10, 10, 10, "Cube 1", None),
+            (10, 11, 10, "Cube 2", None),
+            (11, 10, 10, "Cube 3", None),
+            (20, 20, 20, "Cube 4", None),  # Outside region
         ]
-        
-        for x, y, z, desc in cubes:
-            temp_db.store_cube_description(x, y, z, desc)
+
+        temp_db.store_cube_descriptions(cubes)
         
         # Get cubes in region (10,10,10) to (11,11,11)
         results = temp_db.get_cubes_in_region(10, 10, 10, 11, 11, 11)
@@ -102,6 +99,86 @@ class TestDatabaseManager:
         coordinates = [(r['x'], r['y'], r['z']) for r in results]
         assert coordinates == [(10, 10, 10), (10, 11, 10), (11, 10, 10)]
     
+    def test_read_cache_invalidation(self, temp_db):
+        """Test that cached reads stay consistent across writes and deletes"""
+        # Prime the cache with a miss, then a hit
+        assert temp_db.get_cube_description(7, 7, 7) is None
+        temp_db.store_cube_description(7, 7, 7, "First version")
+        assert temp_db.get_cube_description(7, 7, 7)['description'] == "First version"
+
+        # Overwrite must invalidate the cached row
+        temp_db.store_cube_description(7, 7, 7, "Second version")
+        assert temp_db.get_cube_description(7, 7, 7)['description'] == "Second version"
+
+        # Delete must invalidate as well
+        temp_db.delete_cube(7, 7, 7)
+        assert temp_db.get_cube_description(7, 7, 7) is None
+        assert temp_db.cube_exists(7, 7, 7) == False
+
+    def test_pack_key_round_trip(self):
+        """Test packed coordinate key encoding/decoding"""
+        for coords in [(0, 0, 0), (99, 99, 99), (50, 50, 50), (1, 2, 3)]:
+            key = DatabaseManager._pack_key(*coords)
+            assert DatabaseManager._unpack_key(key) == coords
+
+        # Keys must be unique across the whole world
+        assert DatabaseManager._pack_key(0, 0, 99) != DatabaseManager._pack_key(0, 1, 0)
+
+    def test_store_cube_descriptions_bulk(self, temp_db):
+        """Test storing multiple cube descriptions in one transaction"""
+        rows = [
+            (1, 2, 3, "Bulk cube 1", None),
+            (4, 5, 6, "Bulk cube 2", {"type": "bulk"}),
+            (7, 8, 9, "Bulk cube 3", None),
+        ]
+
+        stored = temp_db.store_cube_descriptions(rows)
+        assert stored == 3
+
+        # All rows should be retrievable
+        result = temp_db.get_cube_description(4, 5, 6)
+        assert result['description'] == "Bulk cube 2"
+        assert result['metadata'] == {"type": "bulk"}
+
+        # Bulk inserts should also replace existing cubes
+        temp_db.store_cube_descriptions([(1, 2, 3, "Replaced", None)])
+        result = temp_db.get_cube_description(1, 2, 3)
+        assert result['description'] == "Replaced"
+
+    def test_get_cubes_in_region_arrays(self, temp_db):
+        """Test column-oriented region retrieval"""
+        temp_db.store_cube_description(10, 10, 10, "Cube 1", {"kind": "street"})
+        temp_db.store_cube_description(10, 11, 10, "Cube 2")
+        temp_db.store_cube_description(20, 20, 20, "Outside")
+
+        coords, descriptions, metadata = temp_db.get_cubes_in_region_arrays(
+            10, 10, 10, 11, 11, 11)
+
+        assert len(coords) == 2
+        assert coords['x'].tolist() == [10, 10]
+        assert coords['y'].tolist() == [10, 11]
+        assert descriptions == ["Cube 1", "Cube 2"]
+
+        # Metadata is decoded lazily per index
+        assert len(metadata) == 2
+        assert metadata[0] == {"kind": "street"}
+        assert metadata[1] is None
+
+    def test_get_cube_descriptions_bulk(self, temp_db):
+        """Test bulk point lookups by coordinate"""
+        temp_db.store_cube_description(1, 1, 1, "Cube A")
+        temp_db.store_cube_description(2, 2, 2, "Cube B", {"type": "bulk"})
+
+        results = temp_db.get_cube_descriptions([(1, 1, 1), (2, 2, 2), (3, 3, 3)])
+
+        # Missing coordinates are absent from the result
+        assert set(results) == {(1, 1, 1), (2, 2, 2)}
+        assert results[(1, 1, 1)]['description'] == "Cube A"
+        assert results[(2, 2, 2)]['metadata'] == {"type": "bulk"}
+
+        # Empty input short-circuits
+        assert temp_db.get_cube_descriptions([]) == {}
+
     def test_get_total_cubes(self, temp_db):
         """Test getting total cube count"""
         assert temp_db.get_total_cubes() == 0
@@ -144,10 +221,12 @@ class TestDatabaseManager:
     
     def test_clear_all_cubes(self, temp_db):
         """Test clearing all cubes"""
-        # Add some cubes
-        temp_db.store_cube_description(1, 1, 1, "Cube 1")
-        temp_db.store_cube_description(2, 2, 2, "Cube 2")
-        temp_db.store_cube_description(3, 3, 3, "Cube 3")
+        # Add some cubes in one batch
+        temp_db.store_cube_descriptions([
+            (1, 1, 1, "Cube 1", None),
+            (2, 2, 2, "Cube 2", None),
+            (3, 3, 3, "Cube 3", None),
+        ])
         
         assert temp_db.get_total_cubes() == 3
         
@@ -167,26 +246,26 @@ class TestDatabaseManager:
             None,  # No metadata
         ]
         
+        temp_db.store_cube_descriptions([
+            (i, i, i, f"Test {i}", metadata)
+            for i, metadata in enumerate(metadata_cases)
+        ])
+
         for i, metadata in enumerate(metadata_cases):
-            temp_db.store_cube_description(i, i, i, f"Test {i}", metadata)
             result = temp_db.get_cube_description(i, i, i)
             assert result['metadata'] == metadata
     
-    def test_context_manager(self):
+    def test_context_manager(self, tmp_path):
         """Test database context manager"""
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.db') as tmp:
-            db_path = tmp.name
-        
-        try:
-            with DatabaseManager(db_path) as db:
-                db.store_cube_description(1, 1, 1, "Test")
-                assert db.cube_exists(1, 1, 1) == True
-            
-            # Connection should be closed after context exit
-            # This is hard to test directly, but we can verify the file exists
-            assert os.path.exists(db_path)
-        finally:
-            os.unlink(db_path)
+        db_path = tmp_path / "test.db"
+
+        with DatabaseManager(str(db_path)) as db:
+            db.store_cube_description(1, 1, 1, "Test")
+            assert db.cube_exists(1, 1, 1) == True
+
+        # Connection should be closed after context exit
+        # This is hard to test directly, but we can verify the file exists
+        assert db_path.exists()
     
     def test_primary_key_constraint(self, temp_db):
         """Test that coordinates act as primary key"""
@@ -223,4 +302,4 @@ class TestDatabaseManager:
             assert result is not None
             assert result['x'] == x
             assert result['y'] == y
-            assert result['z'] == z
+            assert result['z'] == z
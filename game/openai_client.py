@@ -2,38 +2,184 @@
 OpenAI API integration for content generation in Cyberpunk Exploration Game
 """
 
+import asyncio
 import os
+import threading
 import time
 import random
-from typing import Optional, Dict, Any, List
-from openai import OpenAI
+from collections import OrderedDict
+from string import Template
+from typing import Callable, Optional, Dict, Any, List, Tuple
+from openai import OpenAI, AsyncOpenAI
 from config import (
-    OPENAI_API_KEY, OPENAI_MODEL, OPENAI_MAX_TOKENS, 
-    OPENAI_TEMPERATURE, MAX_RETRIES, RETRY_DELAY
+    OPENAI_API_KEY, OPENAI_MODEL, OPENAI_MAX_TOKENS,
+    OPENAI_TEMPERATURE, MAX_RETRIES, RETRY_DELAY, RETRY_MAX_DELAY
 )
 
+# Base templates for offline/fallback descriptions
+_FALLBACK_TEMPLATES = (
+    "A dimly lit cyberpunk alleyway with flickering neon signs casting eerie shadows on the wet pavement.",
+    "An abandoned tech facility with exposed wiring and broken holographic displays scattered across the floor.",
+    "A corporate plaza dominated by towering megacorp buildings, their windows reflecting the neon glow of the city below.",
+    "A underground data hub with rows of humming servers and the constant buzz of electronic equipment.",
+    "A rooftop garden oasis in the urban sprawl, where nature fights to reclaim space from the concrete jungle.",
+    "A bustling street market where vendors sell black-market tech and illegal neural implants.",
+    "A derelict subway station with flickering lights and the distant sound of trains echoing through the tunnels.",
+    "A high-security corporate lobby with armed guards and biometric scanners at every entrance.",
+    "A hacker's den filled with multiple monitors, energy drinks, and the glow of code scrolling across screens.",
+    "A polluted canal where toxic waste mixes with rainwater, creating an otherworldly luminescent effect.",
+)
+
+_LOCATION_CONTEXTS = (
+    "in the industrial district",        # x < 25
+    "in the central business district",  # 25 <= x < 75
+    "in the residential sector",         # x >= 75
+)
+
+_HEIGHT_CONTEXTS = (
+    "at street level",            # y < 25
+    "on the mid-level walkways",  # 25 <= y < 75
+    "on the upper levels",        # y >= 75
+)
+
+# Every (template, x bucket, y bucket) combination pre-formatted once at
+# import time, so a fallback lookup is a single indexed load instead of
+# string formatting plus two if/elif chains per call
+_FALLBACK_LUT = tuple(
+    f"{base} This location is {location} {height}."
+    for base in _FALLBACK_TEMPLATES
+    for location in _LOCATION_CONTEXTS
+    for height in _HEIGHT_CONTEXTS
+)
+
+_N_FALLBACK_TEMPLATES = len(_FALLBACK_TEMPLATES)
+
+# SDK clients are expensive to construct (HTTPX pools, TLS contexts), so
+# one sync client per (factory, api_key) pair is shared across
+# OpenAIClient instances. Keying on the factory keeps separately patched
+# test doubles from colliding with each other or with the real SDK
+# classes. Async clients are deliberately NOT cached here: their
+# connection pool is bound to the event loop that first used it, and
+# each generate_many call runs under a fresh asyncio.run loop.
+_CLIENT_CACHE: Dict[tuple, Any] = {}
+_CLIENT_CACHE_LOCK = threading.Lock()
+
+
+def _cached_sdk_client(factory, api_key: str):
+    """Return the shared SDK client for this factory/key, creating it once"""
+    key = (factory, api_key)
+    with _CLIENT_CACHE_LOCK:
+        client = _CLIENT_CACHE.get(key)
+        if client is None:
+            client = _CLIENT_CACHE[key] = factory(api_key=api_key)
+        return client
+
 
 class OpenAIClient:
     """Manages OpenAI API integration for generating cyberpunk location descriptions"""
-    
-    def __init__(self, api_key: Optional[str] = None, model: str = OPENAI_MODEL):
+
+    # Static prompt text lives in class constants so _build_prompt only
+    # substitutes the coordinates and joins the pieces instead of
+    # rebuilding the instruction block with repeated concatenation on
+    # every call; the Template is parsed once at class construction
+    _PROMPT_HEAD_TMPL = Template("""You are a cyberpunk world generator. Create a vivid, immersive description for a location at coordinates ($x, $y, $z) in a 100x100x100 cube world.
+
+The description should be:
+- You should never mention the coordinates in the description.
+- Cyberpunk themed (neon lights, technology, urban decay, corporate control)
+- 2-3 sentences long
+- Atmospheric and immersive
+- Unique to this specific location
+- Include sensory details (sights, sounds, smells)
+- Include details about the different directions that could be traveled to from this location (to the left, right, up, down, forward, backward is a brief description of the nearby cubes)
+
+Location coordinates: ($x, $y, $z)""")
+
+    _PROMPT_CONTEXT_HEAD = "\n\nSurrounding area context:\n"
+
+    _PROMPT_CONTEXT_TAIL = (
+        "\n\nWhen generating the description make sure the hint from the nearby cubes is consistent with this new location."
+        "\n\nDo not copy direction descriptions from nearby cubes instead use the description of that cube as the hint for that direction from this location."
+        "\n\nUse this context to make the description consistent with the surrounding area while still being unique to this specific location."
+        "\n\nInclude details from the nearby cubes. (to the left, right, up, down, forward, backward is the context of that nearby cubes)"
+    )
+
+    _PROMPT_FOOT = "\n\nDescription:"
+
+    # Maximum memoized descriptions per client instance
+    _DESC_CACHE_MAX = 4096
+
+    # Words the fallback corpus is guaranteed to contain; tests assert
+    # on these through _has_keyword rather than chaining .lower() calls
+    FALLBACK_KEYWORDS = frozenset({'cyberpunk', 'neon'})
+
+    # Circuit breaker: after this many consecutive failed attempts the
+    # client fails fast for the cooldown period instead of burning the
+    # full retry budget on every call during an outage
+    _BREAKER_THRESHOLD = 5
+    _BREAKER_COOLDOWN = 30  # seconds
+
+    # Bound on how long a single HTTP request may hang
+    _REQUEST_TIMEOUT = 20  # seconds
+
+    # The system message never varies, so one shared dict serves every
+    # request instead of a fresh allocation per call
+    _SYSTEM_MESSAGE = {
+        "role": "system",
+        "content": "You are a creative cyberpunk world generator. Generate immersive, atmospheric descriptions.",
+    }
+
+    def __init__(self, api_key: Optional[str] = None, model: str = OPENAI_MODEL,
+                 _sleep: Callable[[float], None] = time.sleep,
+                 _now: Callable[[], float] = time.monotonic):
         """
         Initialize OpenAI client
-        
+
         Args:
             api_key (str, optional): OpenAI API key. If None, uses config or environment variable
             model (str): OpenAI model to use
+            _sleep, _now (callable): Injectable sleep function and
+                monotonic time source; tests substitute a fake clock so
+                rate-limit and retry delays cost no real time
         """
         self.model = model
+        self._sleep = _sleep
+        self._now = _now
         self.api_key = api_key or OPENAI_API_KEY or os.getenv('OPENAI_API_KEY')
         
         if not self.api_key:
             raise OpenAIError("OpenAI API key not found. Set OPENAI_API_KEY in config.py or environment variable.")
         
-        self.client = OpenAI(api_key=self.api_key)
+        self.client = _cached_sdk_client(OpenAI, self.api_key)
+        # The async client is created lazily on first generate_many call
+        # so purely synchronous use never pays for it. It is pinned to
+        # the event loop that created it: each asyncio.run call spins up
+        # and tears down its own loop, and reusing httpx connections
+        # across loops raises "Event loop is closed" on the second batch.
+        self.aclient = None
+        self._aclient_loop = None
         self.last_request_time = 0
         self.request_count = 0
         self.rate_limit_delay = 1.0  # Minimum delay between requests
+        # Earliest monotonic time the next request may start; the limiter
+        # sleeps only the exact residual instead of re-deriving it from
+        # the last request time on every call
+        self._next_slot = self._now()
+        # Shared by the sync and async request paths
+        self._breaker = {'fails': 0, 'open_until': 0.0}
+        # Everything but the messages is identical across requests;
+        # building it once means the hot path only allocates the user
+        # message per call
+        self._base_kwargs = {
+            'model': self.model,
+            'max_tokens': OPENAI_MAX_TOKENS,
+            'temperature': OPENAI_TEMPERATURE,
+            'timeout': self._REQUEST_TIMEOUT,
+        }
+        # LRU memo over successful generations: revisiting a cell with the
+        # same surrounding context skips the rate-limit sleep and the
+        # network round trip entirely
+        self._desc_cache: "OrderedDict[tuple, str]" = OrderedDict()
     
     def generate_location_description(self, x: int, y: int, z: int, 
                                     context_cubes: Optional[List[Dict[str, Any]]] = None) -> str:
@@ -47,13 +193,140 @@ class OpenAIClient:
         Returns:
             str: Generated location description
         """
+        # Memo hit: same cell with the same surrounding context
+        cache_key = (x, y, z, self._context_signature(context_cubes))
+        cached = self._desc_cache.get(cache_key)
+        if cached is not None:
+            self._desc_cache.move_to_end(cache_key)
+            return cached
+
         try:
             prompt = self._build_prompt(x, y, z, context_cubes)
             response = self._make_api_request(prompt)
-            return self._extract_description(response)
-            
+            description = self._extract_description(response)
+
         except Exception as e:
+            # Fallbacks are never cached so the API is retried next time
             return self._get_fallback_description(x, y, z, str(e))
+
+        self._desc_cache[cache_key] = description
+        if len(self._desc_cache) > self._DESC_CACHE_MAX:
+            self._desc_cache.popitem(last=False)
+        return description
+
+    @staticmethod
+    def _context_signature(context_cubes: Optional[List[Dict[str, Any]]]) -> tuple:
+        """Reduce a context-cube list to a hashable, order-independent key"""
+        if not context_cubes:
+            return ()
+        return tuple(sorted((c['x'], c['y'], c['z']) for c in context_cubes))
+
+    def generate_many(self, coords: List[Tuple[int, int, int]],
+                      contexts: Optional[List[Optional[List[Dict[str, Any]]]]] = None,
+                      concurrency: int = 8) -> List[str]:
+        """
+        Generate descriptions for many locations concurrently
+
+        Requests are I/O-bound, so N serialized calls cost N x (latency +
+        rate-limit delay). This fires up to `concurrency` requests at once
+        through the async client, collapsing wall time to roughly
+        latency x (N / concurrency).
+
+        Args:
+            coords (list): (x, y, z) coordinate tuples
+            contexts (list, optional): Per-coordinate context cube lists,
+                parallel to coords
+            concurrency (int): Maximum in-flight API requests
+
+        Returns:
+            list: Descriptions in the same order as coords
+        """
+        return asyncio.run(self.generate_many_async(coords, contexts, concurrency))
+
+    async def generate_many_async(self, coords: List[Tuple[int, int, int]],
+                                  contexts: Optional[List[Optional[List[Dict[str, Any]]]]] = None,
+                                  concurrency: int = 8) -> List[str]:
+        """Async counterpart of generate_many; see there for details"""
+        if contexts is None:
+            contexts = [None] * len(coords)
+
+        semaphore = asyncio.Semaphore(concurrency)
+        return list(await asyncio.gather(*[
+            self._generate_one_async(x, y, z, context, semaphore)
+            for (x, y, z), context in zip(coords, contexts)
+        ]))
+
+    async def _generate_one_async(self, x: int, y: int, z: int,
+                                  context_cubes: Optional[List[Dict[str, Any]]],
+                                  semaphore: asyncio.Semaphore) -> str:
+        """Generate one description under the concurrency semaphore"""
+        cache_key = (x, y, z, self._context_signature(context_cubes))
+        cached = self._desc_cache.get(cache_key)
+        if cached is not None:
+            self._desc_cache.move_to_end(cache_key)
+            return cached
+
+        try:
+            prompt = self._build_prompt(x, y, z, context_cubes)
+            async with semaphore:
+                response = await self._make_api_request_async(prompt)
+            description = self._extract_description(response)
+
+        except Exception as e:
+            return self._get_fallback_description(x, y, z, str(e))
+
+        self._desc_cache[cache_key] = description
+        if len(self._desc_cache) > self._DESC_CACHE_MAX:
+            self._desc_cache.popitem(last=False)
+        return description
+
+    async def _make_api_request_async(self, prompt: str) -> str:
+        """
+        Async variant of _make_api_request with the same retry policy
+
+        The semaphore held by the caller only bounds concurrency; the
+        request rate is bounded here by the same next-slot limiter the
+        sync path uses, awaited instead of slept.
+
+        Args:
+            prompt (str): The prompt to send
+
+        Returns:
+            str: API response content
+        """
+        # A fresh client per event loop: the pooled connections inside an
+        # AsyncOpenAI client belong to the loop they were opened on, so a
+        # client surviving one asyncio.run into the next would fail with
+        # "Event loop is closed" on every request
+        loop = asyncio.get_running_loop()
+        if self.aclient is None or self._aclient_loop is not loop:
+            self.aclient = AsyncOpenAI(api_key=self.api_key)
+            self._aclient_loop = loop
+
+        self._check_breaker()
+        delay = RETRY_DELAY
+        for attempt in range(MAX_RETRIES):
+            try:
+                await self._enforce_rate_limit_async()
+                response = await self.aclient.chat.completions.create(
+                    messages=[self._SYSTEM_MESSAGE,
+                              {"role": "user", "content": prompt}],
+                    **self._base_kwargs
+                )
+
+                self.request_count += 1
+                self._record_success()
+                return response.choices[0].message.content
+
+            except Exception as e:
+                self._record_failure()
+                if attempt < MAX_RETRIES - 1:
+                    delay = min(RETRY_MAX_DELAY,
+                                random.uniform(RETRY_DELAY, delay * 3))
+                    await asyncio.sleep(delay)
+                    continue
+                else:
+                    raise OpenAIError(f"API request failed after {MAX_RETRIES} attempts: {e}")
     
     def _build_prompt(self, x: int, y: int, z: int, 
                      context_cubes: Optional[List[Dict[str, Any]]] = None) -> str:
@@ -67,29 +340,18 @@ class OpenAIClient:
         Returns:
             str: Formatted prompt
         """
-        base_prompt = f"""You are a cyberpunk world generator. Create a vivid, immersive description for a location at coordinates ({x}, {y}, {z}) in a 100x100x100 cube world.
+        head = self._PROMPT_HEAD_TMPL.substitute(x=x, y=y, z=z)
 
-The description should be:
-- You should never mention the coordinates in the description.
-- Cyberpunk themed (neon lights, technology, urban decay, corporate control)
-- 2-3 sentences long
-- Atmospheric and immersive
-- Unique to this specific location
-- Include sensory details (sights, sounds, smells)
-- Include details about the different directions that could be traveled to from this location (to the left, right, up, down, forward, backward is a brief description of the nearby cubes)
-
-Location coordinates: ({x}, {y}, {z})"""
-
-        if context_cubes:
-            context_info = self._format_context(context_cubes)
-            base_prompt += f"\n\nSurrounding area context:\n{context_info}"
-            base_prompt += "\n\nWhen generating the description make sure the hint from the nearby cubes is consistent with this new location."
-            base_prompt += "\n\nDo not copy direction descriptions from nearby cubes instead use the description of that cube as the hint for that direction from this location."
-            base_prompt += "\n\nUse this context to make the description consistent with the surrounding area while still being unique to this specific location."
-            base_prompt += "\n\nInclude details from the nearby cubes. (to the left, right, up, down, forward, backward is the context of that nearby cubes)"
+        if not context_cubes:
+            return head + self._PROMPT_FOOT
 
-        base_prompt += "\n\nDescription:"
-        return base_prompt
+        return "".join((
+            head,
+            self._PROMPT_CONTEXT_HEAD,
+            self._format_context(context_cubes),
+            self._PROMPT_CONTEXT_TAIL,
+            self._PROMPT_FOOT,
+        ))
     
     def _format_context(self, context_cubes: List[Dict[str, Any]]) -> str:
         """
@@ -103,14 +365,13 @@ Location coordinates: ({x}, {y}, {z})"""
         """
         if not context_cubes:
             return "No surrounding context available."
-        
-        context_lines = []
-        for cube in context_cubes:
-            coords = f"({cube['x']}, {cube['y']}, {cube['z']})"
-            desc = cube.get('description', 'Unknown location')
-            context_lines.append(f"- {coords}: {desc}")
-        
-        return "\n".join(context_lines)
+
+        # Single format per cube, streamed straight into the join —
+        # no intermediate list or per-cube coordinate string
+        return "\n".join(
+            f"- ({c['x']}, {c['y']}, {c['z']}): {c.get('description', 'Unknown location')}"
+            for c in context_cubes
+        )
     
     def _make_api_request(self, prompt: str) -> str:
         """
@@ -122,41 +383,112 @@ Location coordinates: ({x}, {y}, {z})"""
         Returns:
             str: API response content
         """
-        self._enforce_rate_limit()
-        
+        self._check_breaker()
+        delay = RETRY_DELAY
         for attempt in range(MAX_RETRIES):
             try:
+                # Rate-limit immediately before the HTTP call so paths
+                # that never reach the network (cache hits, prompt errors)
+                # never sleep
+                self._enforce_rate_limit()
                 response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": "You are a creative cyberpunk world generator. Generate immersive, atmospheric descriptions."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=OPENAI_MAX_TOKENS,
-                    temperature=OPENAI_TEMPERATURE
+                    messages=[self._SYSTEM_MESSAGE,
+                              {"role": "user", "content": prompt}],
+                    **self._base_kwargs
                 )
-                
+
                 self.request_count += 1
+                self._record_success()
                 return response.choices[0].message.content
-                
+
             except Exception as e:
+                self._record_failure()
                 if attempt < MAX_RETRIES - 1:
-                    wait_time = RETRY_DELAY * (2 ** attempt)  # Exponential backoff
-                    time.sleep(wait_time)
+                    # Decorrelated jitter: concurrent callers spread out
+                    # instead of retrying in lockstep after a shared 429
+                    delay = min(RETRY_MAX_DELAY,
+                                random.uniform(RETRY_DELAY, delay * 3))
+                    self._sleep(delay)
                     continue
                 else:
                     raise OpenAIError(f"API request failed after {MAX_RETRIES} attempts: {e}")
     
+    def _check_breaker(self):
+        """Fail fast while the circuit breaker is open
+
+        During a persistent outage every call would otherwise spend the
+        full retry budget (with sleeps) before falling back; once the
+        breaker trips, callers get their fallback immediately until the
+        cooldown expires.
+
+        Raises:
+            OpenAIError: If the breaker is open
+        """
+        if self._now() < self._breaker['open_until']:
+            raise OpenAIError("Circuit breaker open: skipping API request")
+
+    def _record_success(self):
+        """Close the circuit breaker after a successful request"""
+        self._breaker['fails'] = 0
+        self._breaker['open_until'] = 0.0
+
+    def _record_failure(self):
+        """Count a failed attempt, tripping the breaker at the threshold"""
+        self._breaker['fails'] += 1
+        if self._breaker['fails'] >= self._BREAKER_THRESHOLD:
+            self._breaker['open_until'] = self._now() + self._BREAKER_COOLDOWN
+
     def _enforce_rate_limit(self):
-        """Enforce rate limiting between API requests"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        
-        if time_since_last < self.rate_limit_delay:
-            sleep_time = self.rate_limit_delay - time_since_last
-            time.sleep(sleep_time)
-        
-        self.last_request_time = time.time()
+        """Enforce rate limiting between API requests
+
+        Scheduled against the next free request slot on the monotonic
+        clock: wall-clock time can jump under NTP adjustment, which would
+        stretch or skip the delay. Sleeps only the exact residual until
+        the slot opens, which is zero for the first call and for callers
+        that arrive after the delay has already elapsed.
+        """
+        now = self._now()
+        wait = self._next_slot - now
+        if wait > 0:
+            self._sleep(wait)
+            now = self._now()
+
+        self._next_slot = max(self._next_slot, now) + self.rate_limit_delay
+        self.last_request_time = now
+
+    async def _enforce_rate_limit_async(self):
+        """Async counterpart of _enforce_rate_limit
+
+        Tries the non-blocking fast path first; when the limiter is busy
+        it reserves the next free slot BEFORE awaiting, so interleaved
+        coroutines each claim a distinct slot instead of all reading the
+        same one while suspended and firing together when it opens.
+        """
+        if self.acquire_nowait():
+            return
+
+        now = self._now()
+        slot = max(self._next_slot, now)
+        self._next_slot = slot + self.rate_limit_delay
+        await asyncio.sleep(slot - now)
+        self.last_request_time = self._now()
+
+    def acquire_nowait(self) -> bool:
+        """Claim the next request slot if it is already open, without sleeping
+
+        Lets batch callers interleave useful work between in-flight
+        requests instead of idling inside the limiter.
+
+        Returns:
+            bool: True if a slot was claimed, False if the limiter is busy
+        """
+        now = self._now()
+        if now < self._next_slot:
+            return False
+
+        self._next_slot = now + self.rate_limit_delay
+        self.last_request_time = now
+        return True
     
     def _extract_description(self, response: str) -> str:
         """
@@ -168,21 +500,30 @@ Location coordinates: ({x}, {y}, {z})"""
         Returns:
             str: Cleaned description
         """
-        # Remove any leading/trailing whitespace and quotes
+        # One strip, then a single check covers both quote styles: the
+        # first and last characters must be the same quote
         description = response.strip()
-        
-        # Remove surrounding quotes if present
-        if description.startswith('"') and description.endswith('"'):
+        if len(description) >= 2 and description[0] == description[-1] \
+                and description[0] in ('"', "'"):
             description = description[1:-1]
-        elif description.startswith("'") and description.endswith("'"):
-            description = description[1:-1]
-        
+
         # Ensure it's not empty
         if not description:
             raise OpenAIError("Empty response from API")
-        
+
         return description
     
+    @staticmethod
+    def _has_keyword(text: str) -> bool:
+        """Check whether text mentions any fallback keyword
+
+        Lowercases once and probes the shared frozenset, instead of one
+        .lower() per keyword at every call site.
+        """
+        lowered = text.lower()
+        return any(keyword in lowered
+                   for keyword in OpenAIClient.FALLBACK_KEYWORDS)
+
     def _get_fallback_description(self, x: int, y: int, z: int, error: str) -> str:
         """
         Generate fallback description when API fails
@@ -196,41 +537,16 @@ Location coordinates: ({x}, {y}, {z})"""
         """
         # Log the error (in a real implementation, you'd use proper logging)
         print(f"Warning: API failed for ({x}, {y}, {z}): {error}")
-        
-        # Generate contextual fallback based on coordinates
-        fallback_templates = [
-            "A dimly lit cyberpunk alleyway with flickering neon signs casting eerie shadows on the wet pavement.",
-            "An abandoned tech facility with exposed wiring and broken holographic displays scattered across the floor.",
-            "A corporate plaza dominated by towering megacorp buildings, their windows reflecting the neon glow of the city below.",
-            "A underground data hub with rows of humming servers and the constant buzz of electronic equipment.",
-            "A rooftop garden oasis in the urban sprawl, where nature fights to reclaim space from the concrete jungle.",
-            "A bustling street market where vendors sell black-market tech and illegal neural implants.",
-            "A derelict subway station with flickering lights and the distant sound of trains echoing through the tunnels.",
-            "A high-security corporate lobby with armed guards and biometric scanners at every entrance.",
-            "A hacker's den filled with multiple monitors, energy drinks, and the glow of code scrolling across screens.",
-            "A polluted canal where toxic waste mixes with rainwater, creating an otherworldly luminescent effect."
-        ]
-        
-        # Use coordinates to select a consistent fallback
-        seed = (x * 10000 + y * 100 + z) % len(fallback_templates)
-        base_description = fallback_templates[seed]
-        
-        # Add coordinate-specific details
-        if x < 25:
-            location_context = "in the industrial district"
-        elif x < 75:
-            location_context = "in the central business district"
-        else:
-            location_context = "in the residential sector"
-        
-        if y < 25:
-            height_context = "at street level"
-        elif y < 75:
-            height_context = "on the mid-level walkways"
-        else:
-            height_context = "on the upper levels"
-        
-        return f"{base_description} This location is {location_context} {height_context}."
+
+        # Coordinates select a consistent template; the x/y buckets are
+        # computed branchlessly and the fully formatted string comes from
+        # the precomputed lookup table. The seed formula is part of the
+        # observable behavior (tests pin which template specific cells
+        # map to), so keep it stable when touching this path.
+        seed = (x * 10000 + y * 100 + z) % _N_FALLBACK_TEMPLATES
+        x_bucket = (x >= 25) + (x >= 75)
+        y_bucket = (y >= 25) + (y >= 75)
+        return _FALLBACK_LUT[seed * 9 + x_bucket * 3 + y_bucket]
     
     def test_connection(self) -> bool:
         """
@@ -3,27 +3,17 @@ Unit tests for OpenAI API integration
 """
 
 import pytest
-import os
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock
 from game.openai_client import OpenAIClient, OpenAIError
 
 
 class TestOpenAIClient:
-    """Test cases for OpenAIClient class"""
-    
-    @pytest.fixture
-    def mock_openai_client(self):
-        """Create a mock OpenAI client for testing"""
-        with patch('game.openai_client.OpenAI') as mock_openai:
-            mock_client = Mock()
-            mock_openai.return_value = mock_client
-            yield mock_client
-    
-    @pytest.fixture
-    def openai_client(self, mock_openai_client):
-        """Create OpenAIClient instance with mocked OpenAI"""
-        return OpenAIClient(api_key="test-api-key")
-    
+    """Test cases for OpenAIClient class
+
+    The mock_openai_client and openai_client fixtures live in conftest.py
+    so the SDK patch is entered once per session instead of per test.
+    """
+
     def test_initialization_with_api_key(self, mock_openai_client):
         """Test OpenAIClient initialization with API key"""
         client = OpenAIClient(api_key="test-key")
@@ -31,17 +21,17 @@ class TestOpenAIClient:
         assert client.model == "gpt-3.5-turbo"
         assert client.client is not None
     
-    def test_initialization_without_api_key(self):
+    def test_initialization_without_api_key(self, monkeypatch):
         """Test OpenAIClient initialization without API key"""
-        with patch.dict(os.environ, {}, clear=True):
-            with pytest.raises(OpenAIError, match="OpenAI API key not found"):
-                OpenAIClient()
-    
-    def test_initialization_with_env_var(self, mock_openai_client):
+        monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+        with pytest.raises(OpenAIError, match="OpenAI API key not found"):
+            OpenAIClient()
+
+    def test_initialization_with_env_var(self, mock_openai_client, monkeypatch):
         """Test OpenAIClient initialization with environment variable"""
-        with patch.dict(os.environ, {'OPENAI_API_KEY': 'env-key'}):
-            client = OpenAIClient()
-            assert client.api_key == "env-key"
+        monkeypatch.setenv('OPENAI_API_KEY', 'env-key')
+        client = OpenAIClient()
+        assert client.api_key == "env-key"
     
     def test_initialization_with_custom_model(self, mock_openai_client):
         """Test OpenAIClient initialization with custom model"""
@@ -121,7 +111,7 @@ class TestOpenAIClient:
         
         assert isinstance(fallback, str)
         assert len(fallback) > 0
-        assert "cyberpunk" in fallback.lower() or "neon" in fallback.lower()
+        assert OpenAIClient._has_keyword(fallback)
     
     def test_get_fallback_description_consistent(self, openai_client):
         """Test that fallback descriptions are consistent for same coordinates"""
@@ -141,82 +131,169 @@ class TestOpenAIClient:
         assert len(fallback1) > 0
         assert len(fallback2) > 0
     
-    def test_make_api_request_success(self, openai_client, mock_openai_client):
+    def test_make_api_request_success(self, openai_client, mock_openai_client, make_chat_response):
         """Test successful API request"""
-        # Mock the API response
-        mock_response = Mock()
-        mock_response.choices = [Mock()]
-        mock_response.choices[0].message.content = "A cyberpunk location"
-        mock_openai_client.chat.completions.create.return_value = mock_response
+        mock_openai_client.chat.completions.create.return_value = \
+            make_chat_response("A cyberpunk location")
         
         result = openai_client._make_api_request("Test prompt")
         
         assert result == "A cyberpunk location"
         assert openai_client.request_count == 1
     
-    def test_make_api_request_failure_retry(self, openai_client, mock_openai_client):
+    def test_make_api_request_failure_retry(self, openai_client, mock_openai_client, make_chat_response):
         """Test API request with retry logic"""
         # Mock API to fail first, then succeed
-        mock_response = Mock()
-        mock_response.choices = [Mock()]
-        mock_response.choices[0].message.content = "Success after retry"
-        
         mock_openai_client.chat.completions.create.side_effect = [
             Exception("API Error"),
-            mock_response
+            make_chat_response("Success after retry")
         ]
-        
-        with patch('time.sleep'):  # Mock sleep to speed up test
-            result = openai_client._make_api_request("Test prompt")
-        
+
+        # Injected no-op sleep makes the retry delay free
+        client = OpenAIClient(api_key="test-api-key", _sleep=lambda s: None)
+        result = client._make_api_request("Test prompt")
+
         assert result == "Success after retry"
-        assert openai_client.request_count == 1
-    
+        assert client.request_count == 1
+
     def test_make_api_request_max_retries_exceeded(self, openai_client, mock_openai_client):
         """Test API request when max retries are exceeded"""
         mock_openai_client.chat.completions.create.side_effect = Exception("Persistent API Error")
-        
-        with patch('time.sleep'):  # Mock sleep to speed up test
-            with pytest.raises(OpenAIError, match="API request failed after"):
-                openai_client._make_api_request("Test prompt")
-    
-    def test_enforce_rate_limit(self, openai_client):
+
+        client = OpenAIClient(api_key="test-api-key", _sleep=lambda s: None)
+        with pytest.raises(OpenAIError, match="API request failed after"):
+            client._make_api_request("Test prompt")
+
+    def test_enforce_rate_limit(self, mock_openai_client):
         """Test rate limiting enforcement"""
-        import time
-        
-        # Set a high rate limit for testing
-        openai_client.rate_limit_delay = 0.1
-        
-        start_time = time.time()
-        openai_client._enforce_rate_limit()
-        first_call_time = time.time()
-        
-        # Second call should be delayed
-        openai_client._enforce_rate_limit()
-        second_call_time = time.time()
-        
-        # Should have at least the rate limit delay between calls
-        assert (second_call_time - first_call_time) >= 0.1
+        # Fake clock: sleeping advances time without waiting for it
+        clock = [0.0]
+        sleeps = []
+
+        def fake_sleep(seconds):
+            sleeps.append(seconds)
+            clock[0] += seconds
+
+        client = OpenAIClient(api_key="test-api-key",
+                              _sleep=fake_sleep, _now=lambda: clock[0])
+        client.rate_limit_delay = 0.1
+
+        # First call finds an open slot and never sleeps
+        client._enforce_rate_limit()
+        assert sleeps == []
+
+        # Second call must wait out the full delay
+        client._enforce_rate_limit()
+        assert sleeps == [pytest.approx(0.1)]
     
-    def test_generate_location_description_success(self, openai_client, mock_openai_client):
+    @staticmethod
+    def _make_fake_clock_client():
+        """Build a client on a fake clock where sleeping advances time"""
+        clock = [0.0]
+
+        def fake_sleep(seconds):
+            clock[0] += seconds
+
+        client = OpenAIClient(api_key="test-api-key",
+                              _sleep=fake_sleep, _now=lambda: clock[0])
+        return client, clock
+
+    def test_circuit_breaker_opens_after_repeated_failures(self, mock_openai_client):
+        """Test that the breaker fails fast once the failure threshold is hit"""
+        mock_openai_client.chat.completions.create.side_effect = Exception("API down")
+        client, clock = self._make_fake_clock_client()
+
+        # Two full calls burn through enough attempts to trip the breaker
+        for _ in range(2):
+            with pytest.raises(OpenAIError, match="API request failed after"):
+                client._make_api_request("Test prompt")
+
+        calls_before = mock_openai_client.chat.completions.create.call_count
+        with pytest.raises(OpenAIError, match="Circuit breaker open"):
+            client._make_api_request("Test prompt")
+
+        # The open breaker short-circuits before any network attempt
+        assert mock_openai_client.chat.completions.create.call_count == calls_before
+
+    def test_circuit_breaker_closes_after_cooldown(self, mock_openai_client, make_chat_response):
+        """Test that the breaker admits requests again after the cooldown"""
+        mock_openai_client.chat.completions.create.side_effect = Exception("API down")
+        client, clock = self._make_fake_clock_client()
+
+        for _ in range(2):
+            with pytest.raises(OpenAIError, match="API request failed after"):
+                client._make_api_request("Test prompt")
+        with pytest.raises(OpenAIError, match="Circuit breaker open"):
+            client._make_api_request("Test prompt")
+
+        # Generous margin: the jittered retry sleeps already advanced the
+        # fake clock, and each failure re-extends the cooldown window
+        clock[0] += client._BREAKER_COOLDOWN + 60
+
+        mock_openai_client.chat.completions.create.side_effect = None
+        mock_openai_client.chat.completions.create.return_value = \
+            make_chat_response("Back online")
+
+        result = client._make_api_request("Test prompt")
+
+        assert result == "Back online"
+        assert client._breaker['fails'] == 0
+
+    def test_generate_many(self, mock_openai_client, make_chat_response, monkeypatch):
+        """Test concurrent batch generation through the async client"""
+        aclient = Mock()
+        aclient.chat.completions.create = AsyncMock(
+            return_value=make_chat_response("An async cyberpunk location"))
+        async_factory = Mock(return_value=aclient)
+        monkeypatch.setattr('game.openai_client.AsyncOpenAI', async_factory)
+
+        client = OpenAIClient(api_key="test-api-key")
+        client.rate_limit_delay = 0.0  # keep the awaited limiter free
+
+        coords = [(1, 1, 1), (2, 2, 2), (3, 3, 3)]
+        results = client.generate_many(coords, concurrency=2)
+
+        assert results == ["An async cyberpunk location"] * 3
+        assert client.request_count == 3
+
+        # A second batch runs under a new event loop and must get a fresh
+        # async client instead of reusing one bound to the closed loop
+        client.generate_many([(4, 4, 4)])
+        assert async_factory.call_count == 2
+
+    def test_generate_many_fallback_on_failure(self, mock_openai_client, monkeypatch):
+        """Test that failed batch items fall back instead of raising"""
+        aclient = Mock()
+        aclient.chat.completions.create = AsyncMock(side_effect=Exception("API down"))
+        monkeypatch.setattr('game.openai_client.AsyncOpenAI',
+                            Mock(return_value=aclient))
+
+        # Async retry backoff awaits asyncio.sleep directly; make it free
+        async def instant_sleep(seconds):
+            pass
+        monkeypatch.setattr('asyncio.sleep', instant_sleep)
+
+        client = OpenAIClient(api_key="test-api-key")
+        client.rate_limit_delay = 0.0
+
+        results = client.generate_many([(10, 20, 30)])
+
+        assert len(results) == 1
+        assert OpenAIClient._has_keyword(results[0])
+
+    def test_generate_location_description_success(self, openai_client, mock_openai_client, make_chat_response):
         """Test successful location description generation"""
-        # Mock the API response
-        mock_response = Mock()
-        mock_response.choices = [Mock()]
-        mock_response.choices[0].message.content = "A cyberpunk street with neon lights"
-        mock_openai_client.chat.completions.create.return_value = mock_response
+        mock_openai_client.chat.completions.create.return_value = \
+            make_chat_response("A cyberpunk street with neon lights")
         
         result = openai_client.generate_location_description(10, 20, 30)
         
         assert result == "A cyberpunk street with neon lights"
     
-    def test_generate_location_description_with_context(self, openai_client, mock_openai_client):
+    def test_generate_location_description_with_context(self, openai_client, mock_openai_client, make_chat_response):
         """Test location description generation with context"""
-        # Mock the API response
-        mock_response = Mock()
-        mock_response.choices = [Mock()]
-        mock_response.choices[0].message.content = "A cyberpunk location"
-        mock_openai_client.chat.completions.create.return_value = mock_response
+        mock_openai_client.chat.completions.create.return_value = \
+            make_chat_response("A cyberpunk location")
         
         context = [{"x": 9, "y": 20, "z": 30, "description": "Nearby alley"}]
         result = openai_client.generate_location_description(10, 20, 30, context)
@@ -233,14 +310,12 @@ class TestOpenAIClient:
         # Should return a fallback description
         assert isinstance(result, str)
         assert len(result) > 0
-        assert "cyberpunk" in result.lower() or "neon" in result.lower()
+        assert OpenAIClient._has_keyword(result)
     
-    def test_test_connection_success(self, openai_client, mock_openai_client):
+    def test_test_connection_success(self, openai_client, mock_openai_client, make_chat_response):
         """Test successful connection test"""
-        mock_response = Mock()
-        mock_response.choices = [Mock()]
-        mock_response.choices[0].message.content = "Connection test successful"
-        mock_openai_client.chat.completions.create.return_value = mock_response
+        mock_openai_client.chat.completions.create.return_value = \
+            make_chat_response("Connection test successful")
         
         result = openai_client.test_connection()
         assert result == True
@@ -272,12 +347,10 @@ class TestOpenAIClient:
         openai_client.set_rate_limit(0.05)
         assert openai_client.rate_limit_delay == 0.1  # Should be clamped to minimum
     
-    def test_request_count_increment(self, openai_client, mock_openai_client):
+    def test_request_count_increment(self, openai_client, mock_openai_client, make_chat_response):
         """Test that request count increments on successful requests"""
-        mock_response = Mock()
-        mock_response.choices = [Mock()]
-        mock_response.choices[0].message.content = "Test response"
-        mock_openai_client.chat.completions.create.return_value = mock_response
+        mock_openai_client.chat.completions.create.return_value = \
+            make_chat_response("Test response")
         
         assert openai_client.request_count == 0
         
@@ -285,4 +358,4 @@ class TestOpenAIClient:
         assert openai_client.request_count == 1
         
         openai_client.generate_location_description(2, 2, 2)
-        assert openai_client.request_count == 2
+        assert openai_client.request_count == 2
@@ -2,20 +2,32 @@
 World generation and context management for Cyberpunk Exploration Game
 """
 
-from typing import List, Dict, Any, Optional, Tuple
+import asyncio
+import itertools
+from collections import OrderedDict
+from typing import Iterator, List, Dict, Any, Optional, Tuple
 from game.database import DatabaseManager
 from game.openai_client import OpenAIClient
 from game.character import Character
 from config import WORLD_MIN, WORLD_MAX, CONTEXT_RADIUS
 
+# World-shape constants folded once at import: get_world_statistics may
+# be polled every turn and never needs to re-derive them
+_WORLD_SIZE = WORLD_MAX - WORLD_MIN + 1
+_TOTAL_POSSIBLE = _WORLD_SIZE ** 3
+_WORLD_BOUNDS = {'min': WORLD_MIN, 'max': WORLD_MAX, 'size': _WORLD_SIZE}
+
 
 class WorldGenerator:
     """Manages world generation, context gathering, and location description creation"""
-    
+
+    # Maximum locations kept in the in-memory revisit cache
+    _LOCATION_CACHE_MAX = 4096
+
     def __init__(self, database_manager: DatabaseManager, openai_client: OpenAIClient):
         """
         Initialize world generator
-        
+
         Args:
             database_manager (DatabaseManager): Database manager instance
             openai_client (OpenAIClient): OpenAI client instance
@@ -23,6 +35,9 @@ class WorldGenerator:
         self.db = database_manager
         self.openai = openai_client
         self.context_radius = CONTEXT_RADIUS
+        # LRU over visited locations: re-entering a cube becomes a dict
+        # hit with no database (or network) round trip
+        self._location_cache: "OrderedDict[Tuple[int, int, int], Dict[str, Any]]" = OrderedDict()
     
     def get_location_description(self, character: Character) -> Dict[str, Any]:
         """
@@ -35,11 +50,18 @@ class WorldGenerator:
             dict: Location data with description, coordinates, and metadata
         """
         x, y, z = character.position
-        
+
+        # Revisited cube: serve straight from the in-memory cache
+        cache_key = (x, y, z)
+        cached = self._location_cache.get(cache_key)
+        if cached is not None:
+            self._location_cache.move_to_end(cache_key)
+            return cached
+
         # Check if location already exists in database
         existing_location = self.db.get_cube_description(x, y, z)
         if existing_location:
-            return {
+            result = {
                 'x': x,
                 'y': y,
                 'z': z,
@@ -48,37 +70,62 @@ class WorldGenerator:
                 'timestamp': existing_location['timestamp'],
                 'metadata': existing_location.get('metadata')
             }
-        
-        # Generate new location description
-        return self._generate_new_location(character)
+        else:
+            # Generate new location description
+            result = self._generate_new_location(character)
+
+        self._location_cache[cache_key] = result
+        if len(self._location_cache) > self._LOCATION_CACHE_MAX:
+            self._location_cache.popitem(last=False)
+        return result
     
-    def _generate_new_location(self, character: Character) -> Dict[str, Any]:
+    def _generate_new_location(self, character: Character,
+                               store: bool = True) -> Dict[str, Any]:
         """
         Generate a new location description using AI
-        
+
         Args:
             character (Character): Character instance with current position
-            
+            store (bool): Store the result immediately; bulk callers pass
+                False and persist all rows in one write at the end
+
+        Returns:
+            dict: Generated location data
+        """
+        return self._generate_new_location_at(*character.position, store=store)
+
+    def _generate_new_location_at(self, x: int, y: int, z: int,
+                                  store: bool = True) -> Dict[str, Any]:
+        """
+        Generate a new location description for bare coordinates
+
+        Loops that sweep many cubes (pregeneration) call this directly
+        so they never construct a Character per cell just to carry the
+        position through.
+
+        Args:
+            x, y, z (int): Coordinates to generate
+            store (bool): Store the result immediately
+
         Returns:
             dict: Generated location data
         """
-        x, y, z = character.position
-        
         # Gather context from surrounding area
         context_cubes = self._gather_context_cubes(x, y, z)
-        
+
         # Generate description using OpenAI
         description = self.openai.generate_location_description(x, y, z, context_cubes)
-        
+
         # Store in database
         metadata = {
             'generated_by': 'openai',
             'context_cubes_count': len(context_cubes),
-            'character_position': character.position
+            'character_position': (x, y, z)
         }
-        
-        self.db.store_cube_description(x, y, z, description, metadata)
-        
+
+        if store:
+            self.db.store_cube_description(x, y, z, description, metadata)
+
         return {
             'x': x,
             'y': y,
@@ -99,21 +146,16 @@ class WorldGenerator:
         Returns:
             list: List of surrounding cube data
         """
-        # Calculate 3x3x3 grid bounds around current position
+        # One region fetch for the whole neighborhood; the center cube is
+        # popped from the index instead of filtered in a second pass
         min_x, max_x = self._calculate_context_bounds(x, self.context_radius)
         min_y, max_y = self._calculate_context_bounds(y, self.context_radius)
         min_z, max_z = self._calculate_context_bounds(z, self.context_radius)
-        
-        # Get cubes in the context region
-        context_cubes = self.db.get_cubes_in_region(min_x, max_x, min_y, max_y, min_z, max_z)
-        
-        # Filter out the center cube (current position)
-        filtered_cubes = [
-            cube for cube in context_cubes 
-            if not (cube['x'] == x and cube['y'] == y and cube['z'] == z)
-        ]
-        
-        return filtered_cubes
+
+        index = self.db.get_region_index(min_x, min_y, min_z,
+                                         max_x, max_y, max_z)
+        index.pop((x, y, z), None)
+        return list(index.values())
     
     def _calculate_context_bounds(self, center: int, radius: int) -> Tuple[int, int]:
         """
@@ -130,28 +172,46 @@ class WorldGenerator:
         max_bound = min(WORLD_MAX, center + radius)
         return min_bound, max_bound
     
+    def _iter_context_grid(self, x: int, y: int, z: int,
+                           radius: Optional[int] = None) -> Iterator[Tuple[int, int, int]]:
+        """
+        Iterate the grid coordinates around a position without a list
+
+        Streaming consumers (pregeneration sweeps at larger radii) avoid
+        materializing (2r+1)^3 tuples they only walk once.
+
+        Args:
+            x, y, z (int): Center coordinates
+            radius (int, optional): Grid radius, defaults to context_radius
+
+        Returns:
+            iterator: (x, y, z) tuples in the grid
+        """
+        if radius is None:
+            radius = self.context_radius
+
+        min_x, max_x = self._calculate_context_bounds(x, radius)
+        min_y, max_y = self._calculate_context_bounds(y, radius)
+        min_z, max_z = self._calculate_context_bounds(z, radius)
+
+        return itertools.product(range(min_x, max_x + 1),
+                                 range(min_y, max_y + 1),
+                                 range(min_z, max_z + 1))
+
     def get_context_grid_coordinates(self, x: int, y: int, z: int) -> List[Tuple[int, int, int]]:
         """
         Get all coordinates in the 3x3x3 context grid around given position
-        
+
+        Kept list-valued for callers that index or measure the grid;
+        internal loops stream _iter_context_grid instead.
+
         Args:
             x, y, z (int): Center coordinates
-            
+
         Returns:
             list: List of (x, y, z) tuples in context grid
         """
-        coordinates = []
-        
-        min_x, max_x = self._calculate_context_bounds(x, self.context_radius)
-        min_y, max_y = self._calculate_context_bounds(y, self.context_radius)
-        min_z, max_z = self._calculate_context_bounds(z, self.context_radius)
-        
-        for cx in range(min_x, max_x + 1):
-            for cy in range(min_y, max_y + 1):
-                for cz in range(min_z, max_z + 1):
-                    coordinates.append((cx, cy, cz))
-        
-        return coordinates
+        return list(self._iter_context_grid(x, y, z))
     
     def get_context_grid_status(self, x: int, y: int, z: int) -> Dict[str, Any]:
         """
@@ -163,28 +223,30 @@ class WorldGenerator:
         Returns:
             dict: Status information about context grid
         """
-        coordinates = self.get_context_grid_coordinates(x, y, z)
-        
-        status = {
+        bounds_x = self._calculate_context_bounds(x, self.context_radius)
+        bounds_y = self._calculate_context_bounds(y, self.context_radius)
+        bounds_z = self._calculate_context_bounds(z, self.context_radius)
+
+        # One region fetch replaces an existence probe per grid cell;
+        # the missing count follows arithmetically
+        total = ((bounds_x[1] - bounds_x[0] + 1)
+                 * (bounds_y[1] - bounds_y[0] + 1)
+                 * (bounds_z[1] - bounds_z[0] + 1))
+        existing = len(self.db.get_region_index(bounds_x[0], bounds_y[0], bounds_z[0],
+                                                bounds_x[1], bounds_y[1], bounds_z[1]))
+
+        return {
             'center': (x, y, z),
-            'total_cubes': len(coordinates),
-            'existing_cubes': 0,
-            'missing_cubes': 0,
+            'total_cubes': total,
+            'existing_cubes': existing,
+            'missing_cubes': total - existing,
             'context_radius': self.context_radius,
             'bounds': {
-                'x': self._calculate_context_bounds(x, self.context_radius),
-                'y': self._calculate_context_bounds(y, self.context_radius),
-                'z': self._calculate_context_bounds(z, self.context_radius)
+                'x': bounds_x,
+                'y': bounds_y,
+                'z': bounds_z
             }
         }
-        
-        for coord in coordinates:
-            if self.db.cube_exists(*coord):
-                status['existing_cubes'] += 1
-            else:
-                status['missing_cubes'] += 1
-        
-        return status
     
     def pregenerate_area(self, character: Character, radius: int = 1) -> Dict[str, Any]:
         """
@@ -213,33 +275,123 @@ class WorldGenerator:
             'errors': 0,
             'coordinates': []
         }
-        
-        # Generate descriptions for all cubes in the area
-        for cx in range(min_x, max_x + 1):
-            for cy in range(min_y, max_y + 1):
-                for cz in range(min_z, max_z + 1):
-                    results['total_cubes'] += 1
-                    results['coordinates'].append((cx, cy, cz))
-                    
-                    # Skip if already exists
-                    if self.db.cube_exists(cx, cy, cz):
-                        results['existing'] += 1
-                        continue
-                    
-                    try:
-                        # Create temporary character for this position
-                        temp_character = Character((cx, cy, cz))
-                        
-                        # Generate description
-                        location_data = self._generate_new_location(temp_character)
-                        results['generated'] += 1
-                        
-                    except Exception as e:
-                        results['errors'] += 1
-                        print(f"Error generating cube ({cx}, {cy}, {cz}): {e}")
-        
+
+        # One region fetch up front; the loop then tests set membership
+        # instead of asking the database per cube
+        existing = set(self.db.get_region_index(min_x, min_y, min_z,
+                                                max_x, max_y, max_z))
+
+        # Generate descriptions for all cubes in the area; rows are
+        # buffered and persisted in one bulk write after the loop instead
+        # of paying a store round trip per cube
+        rows = []
+        for cx, cy, cz in self._iter_context_grid(x, y, z, radius):
+            results['total_cubes'] += 1
+            results['coordinates'].append((cx, cy, cz))
+
+            # Skip if already exists
+            if (cx, cy, cz) in existing:
+                results['existing'] += 1
+                continue
+
+            try:
+                # Generate straight from the coordinates — no throwaway
+                # Character per cube — deferring the store to the bulk
+                # write below
+                location_data = self._generate_new_location_at(cx, cy, cz,
+                                                               store=False)
+                rows.append((cx, cy, cz, location_data['description'],
+                             location_data.get('metadata')))
+                results['generated'] += 1
+
+            except Exception as e:
+                results['errors'] += 1
+                print(f"Error generating cube ({cx}, {cy}, {cz}): {e}")
+
+        if rows:
+            self.db.store_cube_descriptions(rows)
+
         return results
     
+    def pregenerate_area_concurrent(self, character: Character, radius: int = 1,
+                                    concurrency: int = 8) -> Dict[str, Any]:
+        """
+        Pre-generate an area with concurrent OpenAI requests
+
+        Sync wrapper around pregenerate_area_async for callers without a
+        running event loop.
+
+        Args:
+            character (Character): Character instance
+            radius (int): Radius of area to pre-generate
+            concurrency (int): Maximum in-flight API requests
+
+        Returns:
+            dict: Pre-generation results
+        """
+        return asyncio.run(
+            self.pregenerate_area_async(character, radius, concurrency))
+
+    async def pregenerate_area_async(self, character: Character, radius: int = 1,
+                                     concurrency: int = 8) -> Dict[str, Any]:
+        """
+        Pre-generate descriptions for an area using concurrent API calls
+
+        Serial pre-generation costs one network round trip (plus rate
+        limiting) per missing cube. This finds the missing coordinates
+        with a single region fetch, generates their descriptions
+        concurrently through the async OpenAI client, and stores the
+        results in one bulk write.
+
+        Args:
+            character (Character): Character instance
+            radius (int): Radius of area to pre-generate
+            concurrency (int): Maximum in-flight API requests
+
+        Returns:
+            dict: Pre-generation results (same shape as pregenerate_area)
+        """
+        x, y, z = character.position
+
+        min_x, max_x = self._calculate_context_bounds(x, radius)
+        min_y, max_y = self._calculate_context_bounds(y, radius)
+        min_z, max_z = self._calculate_context_bounds(z, radius)
+
+        coordinates = list(self._iter_context_grid(x, y, z, radius))
+
+        # One region fetch decides which cubes still need generation
+        index = self.db.get_region_index(min_x, min_y, min_z,
+                                         max_x, max_y, max_z)
+        missing = [coord for coord in coordinates if coord not in index]
+
+        results = {
+            'center': (x, y, z),
+            'radius': radius,
+            'total_cubes': len(coordinates),
+            'generated': 0,
+            'existing': len(coordinates) - len(missing),
+            'errors': 0,
+            'coordinates': coordinates
+        }
+
+        if missing:
+            contexts = [self._gather_context_cubes(*coord) for coord in missing]
+            descriptions = await self.openai.generate_many_async(
+                missing, contexts, concurrency)
+
+            rows = [
+                (cx, cy, cz, description, {
+                    'generated_by': 'openai',
+                    'context_cubes_count': len(context),
+                    'character_position': (cx, cy, cz)
+                })
+                for (cx, cy, cz), context, description
+                in zip(missing, contexts, descriptions)
+            ]
+            results['generated'] = self.db.store_cube_descriptions(rows)
+
+        return results
+
     def get_world_statistics(self) -> Dict[str, Any]:
         """
         Get statistics about the generated world
@@ -249,21 +401,16 @@ class WorldGenerator:
         """
         total_cubes = self.db.get_total_cubes()
         recent_cubes = self.db.get_recent_cubes(10)
-        
+
         # Calculate world coverage percentage
-        total_possible = (WORLD_MAX - WORLD_MIN + 1) ** 3
-        coverage_percentage = (total_cubes / total_possible) * 100
-        
+        coverage_percentage = (total_cubes / _TOTAL_POSSIBLE) * 100
+
         return {
             'total_generated_cubes': total_cubes,
-            'total_possible_cubes': total_possible,
+            'total_possible_cubes': _TOTAL_POSSIBLE,
             'coverage_percentage': round(coverage_percentage, 2),
             'recent_cubes': recent_cubes,
-            'world_bounds': {
-                'min': WORLD_MIN,
-                'max': WORLD_MAX,
-                'size': WORLD_MAX - WORLD_MIN + 1
-            }
+            'world_bounds': _WORLD_BOUNDS
         }
     
     def clear_world_data(self) -> int:
@@ -273,40 +420,40 @@ class WorldGenerator:
         Returns:
             int: Number of cubes cleared
         """
+        self._location_cache.clear()
         return self.db.clear_all_cubes()
     
-    def export_world_data(self, filepath: str) -> bool:
+    def export_world_data(self, filepath: str) -> Tuple[bool, int]:
         """
         Export world data to a file (for backup/debugging)
-        
+
         Args:
             filepath (str): Path to export file
-            
+
         Returns:
-            bool: True if successful
+            tuple: (success, number of cubes exported) — the count comes
+                from the rows already streamed, so callers do not need a
+                follow-up statistics query
         """
         try:
-            # Get all cubes
-            all_cubes = self.db.get_cubes_in_region(
-                WORLD_MIN, WORLD_MAX, 
-                WORLD_MIN, WORLD_MAX, 
-                WORLD_MIN, WORLD_MAX
-            )
-            
-            # Write to file
-            with open(filepath, 'w', encoding='utf-8') as f:
+            # Stream cubes straight from the database cursor into a
+            # large-buffered writer: peak memory stays flat regardless of
+            # world size, and the header count is an O(1) lookup
+            count = 0
+            with open(filepath, 'w', encoding='utf-8', buffering=1 << 20) as f:
                 f.write("# Cyberpunk Exploration Game - World Data Export\n")
-                f.write(f"# Total cubes: {len(all_cubes)}\n")
+                f.write(f"# Total cubes: {self.db.get_total_cubes()}\n")
                 f.write(f"# Export timestamp: {self._get_timestamp()}\n\n")
-                
-                for cube in all_cubes:
+
+                for cube in self.db.iter_all_cubes():
                     f.write(f"({cube['x']}, {cube['y']}, {cube['z']}): {cube['description']}\n")
-            
-            return True
-            
+                    count += 1
+
+            return True, count
+
         except Exception as e:
             print(f"Error exporting world data: {e}")
-            return False
+            return False, 0
     
     def _get_timestamp(self) -> str:
         """Get current timestamp string"""
@@ -324,35 +471,26 @@ class WorldGenerator:
             'valid': True,
             'errors': [],
             'warnings': [],
-            'total_cubes_checked': 0
+            'total_cubes_checked': self.db.count_cubes_exact()
         }
-        
-        # Get all cubes
-        all_cubes = self.db.get_cubes_in_region(
-            WORLD_MIN, WORLD_MAX,
-            WORLD_MIN, WORLD_MAX,
-            WORLD_MIN, WORLD_MAX
-        )
-        
-        validation['total_cubes_checked'] = len(all_cubes)
-        
-        for cube in all_cubes:
-            # Check coordinate bounds
-            x, y, z = cube['x'], cube['y'], cube['z']
+
+        # The database returns only the offending rows, so the Python
+        # side just classifies them; healthy worlds do no per-cube work
+        for x, y, z, description in self.db.find_invalid_cubes(WORLD_MIN, WORLD_MAX):
             if not (WORLD_MIN <= x <= WORLD_MAX):
                 validation['errors'].append(f"Cube ({x}, {y}, {z}) has invalid X coordinate")
                 validation['valid'] = False
-            
+
             if not (WORLD_MIN <= y <= WORLD_MAX):
                 validation['errors'].append(f"Cube ({x}, {y}, {z}) has invalid Y coordinate")
                 validation['valid'] = False
-            
+
             if not (WORLD_MIN <= z <= WORLD_MAX):
                 validation['errors'].append(f"Cube ({x}, {y}, {z}) has invalid Z coordinate")
                 validation['valid'] = False
-            
+
             # Check description
-            if not cube.get('description') or len(cube['description'].strip()) == 0:
+            if not description or len(description.strip()) == 0:
                 validation['warnings'].append(f"Cube ({x}, {y}, {z}) has empty description")
-        
-        return validation
+
+        return validation
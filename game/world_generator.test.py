@@ -2,10 +2,11 @@
 Unit tests for world generation and context management
 """
 
+import copy
+import numpy as np
 import pytest
-import tempfile
-import os
-from unittest.mock import Mock, patch, MagicMock
+import shutil
+from unittest.mock import Mock, patch, create_autospec
 from game.world_generator import WorldGenerator
 from game.database import DatabaseManager
 from game.openai_client import OpenAIClient
@@ -13,35 +14,96 @@ from game.character import Character
 from config import WORLD_MIN, WORLD_MAX, CONTEXT_RADIUS
 
 
+@pytest.fixture(scope="session")
+def golden_db_path(tmp_path_factory):
+    """Build the database schema once per session
+
+    Each test then starts from a file copy of this golden database
+    instead of re-running the schema DDL.
+    """
+    path = tmp_path_factory.mktemp("golden") / "golden.db"
+    DatabaseManager(str(path)).close()
+    return path
+
+
+@pytest.fixture(scope="session")
+def shared_db(golden_db_path, tmp_path_factory):
+    """One DatabaseManager shared by every database-backed test
+
+    Opening a manager (connection, pragmas, presence scan, writer
+    thread) once per session replaces twenty-odd constructions; tests
+    get it through temp_db, which empties it between tests.
+    """
+    db_path = tmp_path_factory.mktemp("shared") / "world.db"
+    shutil.copyfile(golden_db_path, db_path)
+
+    db_manager = DatabaseManager(str(db_path))
+    # Disposable database: keep the journal in memory and skip fsyncs
+    # entirely. Only durability is relaxed — schema and transaction
+    # semantics are unchanged, so tests see the same behavior the
+    # production pragmas give, minus the disk waits.
+    db_manager.connection.executescript(
+        "PRAGMA journal_mode=MEMORY;"
+        "PRAGMA synchronous=OFF;"
+        "PRAGMA temp_store=MEMORY;"
+    )
+    yield db_manager
+
+    db_manager.close()
+
+
+@pytest.fixture(scope="session")
+def _db_template():
+    """Autospec'd DatabaseManager built once per session
+
+    Pure coordinate-math tests need a DB-shaped object, not a real
+    sqlite file; copies of this template skip schema creation entirely.
+    """
+    return create_autospec(DatabaseManager, instance=True)
+
+
 class TestWorldGenerator:
     """Test cases for WorldGenerator class"""
-    
+
     @pytest.fixture
-    def temp_db(self):
-        """Create a temporary database for testing"""
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.db') as tmp:
-            db_path = tmp.name
-        
-        db_manager = DatabaseManager(db_path)
-        yield db_manager
-        
-        # Cleanup
-        db_manager.close()
-        os.unlink(db_path)
+    def temp_db(self, shared_db):
+        """Hand each test the shared database, starting empty
+
+        clear_all_cubes resets the read cache, presence bitset, and row
+        counter together with the table, so every test begins from a
+        coherent empty world without constructing a new manager. A
+        savepoint/rollback scheme would undo the rows but leave those
+        in-memory structures out of sync.
+        """
+        shared_db.clear_all_cubes()
+        return shared_db
+
+    @pytest.fixture
+    def fake_db(self, _db_template):
+        """Database stand-in for tests that never touch storage"""
+        return copy.copy(_db_template)
     
     @pytest.fixture
     def mock_openai_client(self):
-        """Create a mock OpenAI client"""
-        with patch('game.world_generator.OpenAIClient') as mock_openai:
-            mock_client = Mock()
-            mock_client.generate_location_description.return_value = "A cyberpunk test location"
-            mock_openai.return_value = mock_client
-            yield mock_client
+        """Create a mock OpenAI client
+
+        WorldGenerator takes the client as a constructor argument, so a
+        plain Mock injected directly does the job without mock.patch's
+        start/stop overhead; the real OpenAIClient is never constructed.
+        """
+        mock_client = Mock()
+        mock_client.generate_location_description.return_value = "A cyberpunk test location"
+        return mock_client
     
     @pytest.fixture
     def world_generator(self, temp_db, mock_openai_client):
         """Create WorldGenerator instance with mocked dependencies"""
         return WorldGenerator(temp_db, mock_openai_client)
+
+    @pytest.fixture
+    def pure_world_generator(self, fake_db, mock_openai_client):
+        """WorldGenerator over a fake database, for pure coordinate math"""
+        return WorldGenerator(fake_db, mock_openai_client)
     
     def test_initialization(self, temp_db, mock_openai_client):
         """Test WorldGenerator initialization"""
@@ -81,65 +143,52 @@ class TestWorldGenerator:
         # Verify OpenAI was called
         mock_openai_client.generate_location_description.assert_called_once()
     
-    def test_calculate_context_bounds_center(self, world_generator):
-        """Test context bounds calculation at center of world"""
-        min_bound, max_bound = world_generator._calculate_context_bounds(50, 1)
-        assert min_bound == 49
-        assert max_bound == 51
-    
-    def test_calculate_context_bounds_edge(self, world_generator):
-        """Test context bounds calculation at world edge"""
-        # Test at minimum boundary
-        min_bound, max_bound = world_generator._calculate_context_bounds(0, 1)
-        assert min_bound == 0
-        assert max_bound == 1
-        
-        # Test at maximum boundary
-        min_bound, max_bound = world_generator._calculate_context_bounds(99, 1)
-        assert min_bound == 98
-        assert max_bound == 99
+    @pytest.mark.parametrize("center, expected_min, expected_max", [
+        (50, 49, 51),  # center of world
+        (0, 0, 1),     # minimum boundary
+        (99, 98, 99),  # maximum boundary
+    ])
+    def test_calculate_context_bounds(self, pure_world_generator,
+                                      center, expected_min, expected_max):
+        """Test context bounds calculation at the center and world edges"""
+        bounds = pure_world_generator._calculate_context_bounds(center, 1)
+        assert bounds == (expected_min, expected_max)
     
-    def test_get_context_grid_coordinates(self, world_generator):
+    def test_get_context_grid_coordinates(self, pure_world_generator):
         """Test getting context grid coordinates"""
-        coordinates = world_generator.get_context_grid_coordinates(50, 50, 50)
-        
+        coordinates = pure_world_generator.get_context_grid_coordinates(50, 50, 50)
+
         # Should have 3x3x3 = 27 coordinates
         assert len(coordinates) == 27
-        
-        # Check that center is included
-        assert (50, 50, 50) in coordinates
-        
-        # Check bounds
-        x_coords = [coord[0] for coord in coordinates]
-        y_coords = [coord[1] for coord in coordinates]
-        z_coords = [coord[2] for coord in coordinates]
-        
-        assert min(x_coords) == 49
-        assert max(x_coords) == 51
-        assert min(y_coords) == 49
-        assert max(y_coords) == 51
-        assert min(z_coords) == 49
-        assert max(z_coords) == 51
+
+        # One set comparison checks membership, bounds, and duplicates
+        # in a single pass
+        expected = {(x, y, z)
+                    for x in (49, 50, 51)
+                    for y in (49, 50, 51)
+                    for z in (49, 50, 51)}
+        assert set(coordinates) == expected
     
-    def test_get_context_grid_coordinates_edge(self, world_generator):
+    def test_get_context_grid_coordinates_edge(self, pure_world_generator):
         """Test context grid coordinates at world edge"""
-        coordinates = world_generator.get_context_grid_coordinates(0, 0, 0)
-        
+        coordinates = pure_world_generator.get_context_grid_coordinates(0, 0, 0)
+
         # Should have fewer coordinates due to boundary constraints
         assert len(coordinates) < 27
-        
-        # All coordinates should be within world bounds
-        for x, y, z in coordinates:
-            assert WORLD_MIN <= x <= WORLD_MAX
-            assert WORLD_MIN <= y <= WORLD_MAX
-            assert WORLD_MIN <= z <= WORLD_MAX
+
+        # All coordinates should be within world bounds: two vectorized
+        # comparisons instead of a per-coordinate Python loop
+        arr = np.array(coordinates)
+        assert (arr >= WORLD_MIN).all() and (arr <= WORLD_MAX).all()
     
     def test_gather_context_cubes(self, world_generator, temp_db):
         """Test gathering context cubes"""
-        # Store some cubes around the center
-        temp_db.store_cube_description(49, 50, 50, "Left neighbor")
-        temp_db.store_cube_description(51, 50, 50, "Right neighbor")
-        temp_db.store_cube_description(50, 50, 50, "Center cube")
+        # Store some cubes around the center in one batch
+        temp_db.store_cube_descriptions([
+            (49, 50, 50, "Left neighbor", None),
+            (51, 50, 50, "Right neighbor", None),
+            (50, 50, 50, "Center cube", None),
+        ])
         
         context_cubes = world_generator._gather_context_cubes(50, 50, 50)
         
@@ -157,9 +206,11 @@ class TestWorldGenerator:
     
     def test_get_context_grid_status(self, world_generator, temp_db):
         """Test getting context grid status"""
-        # Store some cubes
-        temp_db.store_cube_description(49, 50, 50, "Test cube 1")
-        temp_db.store_cube_description(51, 50, 50, "Test cube 2")
+        # Store some cubes in one batch
+        temp_db.store_cube_descriptions([
+            (49, 50, 50, "Test cube 1", None),
+            (51, 50, 50, "Test cube 2", None),
+        ])
         
         status = world_generator.get_context_grid_status(50, 50, 50)
         
@@ -191,11 +242,38 @@ class TestWorldGenerator:
         assert results['errors'] >= 0
         assert len(results['coordinates']) == 27
     
+    def test_pregenerate_area_concurrent(self, world_generator, temp_db,
+                                         mock_openai_client):
+        """Test concurrent area pre-generation persists the batch results"""
+        character = Character((50, 50, 50))
+
+        # A Mock return value is not awaitable, so the batch entry point
+        # gets a real coroutine function standing in for the client
+        async def fake_generate_many_async(coords, contexts=None, concurrency=8):
+            return [f"Cube {coord}" for coord in coords]
+
+        mock_openai_client.generate_many_async = fake_generate_many_async
+
+        results = world_generator.pregenerate_area_concurrent(character, radius=1)
+
+        assert results['center'] == (50, 50, 50)
+        assert results['total_cubes'] == 27  # 3x3x3
+        assert results['generated'] == 27
+        assert results['existing'] == 0
+        assert temp_db.get_total_cubes() == 27
+
+        # A second run finds everything already stored
+        results = world_generator.pregenerate_area_concurrent(character, radius=1)
+        assert results['generated'] == 0
+        assert results['existing'] == 27
+
     def test_get_world_statistics(self, world_generator, temp_db):
         """Test getting world statistics"""
-        # Add some cubes
-        temp_db.store_cube_description(1, 1, 1, "Test cube 1")
-        temp_db.store_cube_description(2, 2, 2, "Test cube 2")
+        # Add some cubes in one batch
+        temp_db.store_cube_descriptions([
+            (1, 1, 1, "Test cube 1", None),
+            (2, 2, 2, "Test cube 2", None),
+        ])
         
         stats = world_generator.get_world_statistics()
         
@@ -209,9 +287,11 @@ class TestWorldGenerator:
     
     def test_clear_world_data(self, world_generator, temp_db):
         """Test clearing world data"""
-        # Add some cubes
-        temp_db.store_cube_description(1, 1, 1, "Test cube 1")
-        temp_db.store_cube_description(2, 2, 2, "Test cube 2")
+        # Add some cubes in one batch
+        temp_db.store_cube_descriptions([
+            (1, 1, 1, "Test cube 1", None),
+            (2, 2, 2, "Test cube 2", None),
+        ])
         
         assert temp_db.get_total_cubes() == 2
         
@@ -220,75 +300,66 @@ class TestWorldGenerator:
         assert cleared_count == 2
         assert temp_db.get_total_cubes() == 0
     
-    def test_export_world_data(self, world_generator, temp_db):
+    def test_export_world_data(self, world_generator, temp_db, tmp_path):
         """Test exporting world data"""
-        # Add some cubes
-        temp_db.store_cube_description(1, 1, 1, "Test cube 1")
-        temp_db.store_cube_description(2, 2, 2, "Test cube 2")
-        
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as tmp:
-            export_path = tmp.name
-        
-        try:
-            result = world_generator.export_world_data(export_path)
-            
-            assert result == True
-            
-            # Check file contents
-            with open(export_path, 'r') as f:
-                content = f.read()
-            
-            assert "Cyberpunk Exploration Game" in content
-            assert "Total cubes: 2" in content
-            assert "(1, 1, 1): Test cube 1" in content
-            assert "(2, 2, 2): Test cube 2" in content
-        
-        finally:
-            os.unlink(export_path)
-    
-    def test_validate_world_integrity_valid(self, world_generator, temp_db):
-        """Test world integrity validation with valid data"""
-        # Add valid cubes
-        temp_db.store_cube_description(50, 50, 50, "Valid cube 1")
-        temp_db.store_cube_description(51, 51, 51, "Valid cube 2")
-        
-        validation = world_generator.validate_world_integrity()
-        
-        assert validation['valid'] == True
-        assert len(validation['errors']) == 0
-        assert validation['total_cubes_checked'] == 2
-    
-    def test_validate_world_integrity_invalid(self, world_generator, temp_db):
-        """Test world integrity validation with invalid data"""
-        # Manually insert invalid data (bypassing normal validation)
-        cursor = temp_db.connection.cursor()
-        cursor.execute('''
-            INSERT INTO cube_data (x, y, z, description, timestamp)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (150, 50, 50, "Invalid X coordinate", "2023-01-01"))
-        temp_db.connection.commit()
-        
-        validation = world_generator.validate_world_integrity()
-        
-        assert validation['valid'] == False
-        assert len(validation['errors']) > 0
-        assert any("invalid X coordinate" in error.lower() for error in validation['errors'])
+        # Add some cubes in one batch
+        temp_db.store_cube_descriptions([
+            (1, 1, 1, "Test cube 1", None),
+            (2, 2, 2, "Test cube 2", None),
+        ])
+
+        # tmp_path is cleaned up by pytest — no manual unlink needed
+        export_path = tmp_path / "export.txt"
+        success, count = world_generator.export_world_data(str(export_path))
+
+        assert success == True
+        assert count == 2
+
+        # Check file contents
+        content = export_path.read_text()
+
+        assert "Cyberpunk Exploration Game" in content
+        assert "Total cubes: 2" in content
+        assert "(1, 1, 1): Test cube 1" in content
+        assert "(2, 2, 2): Test cube 2" in content
     
-    def test_validate_world_integrity_empty_description(self, world_generator, temp_db):
-        """Test world integrity validation with empty description"""
-        # Manually insert cube with empty description
-        cursor = temp_db.connection.cursor()
-        cursor.execute('''
-            INSERT INTO cube_data (x, y, z, description, timestamp)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (50, 50, 50, "", "2023-01-01"))
-        temp_db.connection.commit()
-        
+    @pytest.mark.parametrize("rows, valid, err_needle, warn_needle", [
+        # All rows in bounds with descriptions: clean report
+        ([(50, 50, 50, "Valid cube 1"), (51, 51, 51, "Valid cube 2")],
+         True, None, None),
+        # Out-of-bounds X coordinate: hard error
+        ([(150, 50, 50, "Invalid X coordinate")],
+         False, "invalid x coordinate", None),
+        # Empty description: warning only, world still valid
+        ([(50, 50, 50, "")],
+         True, None, "empty description"),
+    ])
+    def test_validate_world_integrity(self, world_generator, temp_db,
+                                      rows, valid, err_needle, warn_needle):
+        """Test world integrity validation across valid and broken data"""
+        # Insert raw rows in one transaction, bypassing the store path's
+        # normal validation so broken data can reach the database
+        with temp_db.connection:
+            temp_db.connection.executemany('''
+                INSERT INTO cube_data (x, y, z, description, timestamp)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(x, y, z, description, "2023-01-01")
+                  for x, y, z, description in rows])
+
         validation = world_generator.validate_world_integrity()
-        
-        assert validation['valid'] == True  # Empty description is warning, not error
-        assert len(validation['warnings']) > 0
-        assert any("empty description" in warning.lower() for warning in validation['warnings'])
+
+        assert validation['valid'] == valid
+        assert validation['total_cubes_checked'] == len(rows)
+
+        if err_needle is None:
+            assert len(validation['errors']) == 0
+        else:
+            assert any(err_needle in error.lower()
+                       for error in validation['errors'])
+
+        if warn_needle is not None:
+            assert any(warn_needle in warning.lower()
+                       for warning in validation['warnings'])
     
     def test_generate_new_location_integration(self, world_generator, mock_openai_client):
         """Test full integration of new location generation"""
@@ -309,17 +380,19 @@ class TestWorldGenerator:
         assert stored_cube is not None
         assert stored_cube['description'] == "A cyberpunk test location"
     
-    def test_context_radius_customization(self, temp_db, mock_openai_client):
+    def test_context_radius_customization(self, fake_db, mock_openai_client):
         """Test custom context radius"""
-        generator = WorldGenerator(temp_db, mock_openai_client)
+        generator = WorldGenerator(fake_db, mock_openai_client)
         generator.context_radius = 2  # 5x5x5 grid
         
         coordinates = generator.get_context_grid_coordinates(50, 50, 50)
-        
+
         # Should have 5x5x5 = 125 coordinates
         assert len(coordinates) == 125
-        
-        # Check bounds
-        x_coords = [coord[0] for coord in coordinates]
-        assert min(x_coords) == 48
-        assert max(x_coords) == 52
+
+        # Set equality covers bounds and duplicates in one comparison
+        expected = {(x, y, z)
+                    for x in range(48, 53)
+                    for y in range(48, 53)
+                    for z in range(48, 53)}
+        assert set(coordinates) == expected
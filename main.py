@@ -5,16 +5,18 @@ Main entry point and game loop
 """
 
 import sys
-import os
 import time
+from pathlib import Path
 from config import *
-from dotenv import load_dotenv
 from game.character import Character
 from game.database import DatabaseManager
-from game.openai_client import OpenAIClient
-from game.world_generator import WorldGenerator
 from game.display import DisplayManager
 
+# dotenv, the OpenAI client, and the world generator (which pulls the
+# openai SDK's import graph in transitively) are imported inside
+# initialize(): importing this module stays cheap for paths that never
+# start a game, and config errors fail fast
+
 
 class CyberpunkGame:
     """Main game class that coordinates all components"""
@@ -27,10 +29,45 @@ class CyberpunkGame:
         self.world_generator = None
         self.display = DisplayManager()
         self.running = False
+        # One-slot cache over the current location: non-movement
+        # commands (help, stats, validate) re-enter the loop without a
+        # position change, so the redisplay costs nothing. A position
+        # change switches the key, which invalidates it automatically.
+        self._loc_cache = (None, None)  # (position, location_data)
+        # Dispatch tables built once: each keystroke costs two dict
+        # lookups instead of walking an if/elif chain that rebuilds its
+        # list literals on every call. Movement maps to a direction
+        # because the character (and its bound move methods) does not
+        # exist until initialize(); note 'q' means backward, matching
+        # the original command precedence.
+        self._movement_commands = {
+            'w': 'up', 'up': 'up',
+            's': 'down', 'down': 'down',
+            'a': 'left', 'left': 'left',
+            'd': 'right', 'right': 'right',
+            'e': 'forward', 'forward': 'forward',
+            'q': 'backward', 'backward': 'backward',
+        }
+        self._game_commands = {
+            'help': self.display.display_help,
+            'h': self.display.display_help,
+            'stats': self.show_world_statistics,
+            'statistics': self.show_world_statistics,
+            'export': self.export_world_data,
+            'clear': self.clear_world_data,
+            'validate': self.validate_world,
+            'quit': self.quit_game,
+            'exit': self.quit_game,
+        }
     
     def initialize(self):
         """Initialize all game components"""
         try:
+            # Deferred imports: see the note at the top of the module
+            from dotenv import load_dotenv
+            from game.openai_client import OpenAIClient
+            from game.world_generator import WorldGenerator
+
             load_dotenv()
             # Initialize character
             self.character = Character()
@@ -69,9 +106,15 @@ class CyberpunkGame:
         # Main game loop
         while self.running:
             try:
-                # Get current location description
-                location_data = self.world_generator.get_location_description(self.character)
-                
+                # Get current location description, skipping the lookup
+                # entirely when the character has not moved
+                position = self.character.position
+                if self._loc_cache[0] == position:
+                    location_data = self._loc_cache[1]
+                else:
+                    location_data = self.world_generator.get_location_description(self.character)
+                    self._loc_cache = (position, location_data)
+
                 # Display location
                 self.display.display_location_info(location_data, self.character.position)
                 
@@ -95,70 +138,54 @@ class CyberpunkGame:
             return
         
         # Movement commands
-        if user_input in ['w', 'up']:
-            self.move_character('up', self.character.move_up)
-        elif user_input in ['s', 'down']:
-            self.move_character('down', self.character.move_down)
-        elif user_input in ['a', 'left']:
-            self.move_character('left', self.character.move_left)
-        elif user_input in ['d', 'right']:
-            self.move_character('right', self.character.move_right)
-        elif user_input in ['e', 'forward']:
-            self.move_character('forward', self.character.move_forward)
-        elif user_input in ['q', 'backward']:
-            self.move_character('backward', self.character.move_backward)
-        
+        direction = self._movement_commands.get(user_input)
+        if direction is not None:
+            self.move_character(direction,
+                                getattr(self.character, 'move_' + direction))
+            return
+
         # Game commands
-        elif user_input in ['help', 'h']:
-            self.display.display_help()
-        elif user_input in ['stats', 'statistics']:
-            self.show_world_statistics()
-        elif user_input in ['export']:
-            self.export_world_data()
-        elif user_input in ['clear']:
-            self.clear_world_data()
-        elif user_input in ['validate']:
-            self.validate_world()
-        elif user_input in ['quit', 'exit', 'q']:
-            self.quit_game()
+        handler = self._game_commands.get(user_input)
+        if handler is not None:
+            handler()
         else:
             self.display.display_invalid_command(user_input)
     
     def move_character(self, direction: str, move_func):
         """Handle character movement with feedback"""
-        start_time = time.time()
-        
+        start_ns = time.perf_counter_ns()
+
         # Show loading indicator for movement
         self.display.display_loading_indicator(f"Moving {direction}")
-        
+
         # Perform movement
         success = move_func()
-        
+
         # Calculate duration
-        duration = time.time() - start_time
-        
+        elapsed_ns = time.perf_counter_ns() - start_ns
+
         # Display feedback
         self.display.display_movement_feedback(direction, success, self.character.position)
-        
+
         # Show performance info if movement was slow
-        if duration > 0.5:
-            self.display.display_performance_info("Movement", duration)
+        if elapsed_ns > 500_000_000:
+            self.display.display_performance_info("Movement", elapsed_ns / 1e9)
         
         self.display.display_pause()
     
     def show_world_statistics(self):
         """Display world statistics"""
         try:
-            start_time = time.time()
+            start_ns = time.perf_counter_ns()
             self.display.display_loading_indicator("Loading statistics")
-            
+
             stats = self.world_generator.get_world_statistics()
-            duration = time.time() - start_time
-            
+            elapsed_ns = time.perf_counter_ns() - start_ns
+
             self.display.display_world_statistics(stats)
-            
-            if duration > 1.0:
-                self.display.display_performance_info("Statistics query", duration)
+
+            if elapsed_ns > 1_000_000_000:
+                self.display.display_performance_info("Statistics query", elapsed_ns / 1e9)
                 
         except Exception as e:
             self.display.display_error_message("Statistics", f"Failed to load statistics: {e}")
@@ -168,24 +195,23 @@ class CyberpunkGame:
         """Export world data to file"""
         try:
             # Get export filename
-            filename = f"cyberpunk_world_export_{int(time.time())}.txt"
-            filepath = os.path.join(os.getcwd(), filename)
+            filepath = str(Path.cwd() / f"cyberpunk_world_export_{int(time.time())}.txt")
             
-            start_time = time.time()
+            start_ns = time.perf_counter_ns()
             self.display.display_loading_indicator("Exporting world data")
-            
-            success = self.world_generator.export_world_data(filepath)
-            duration = time.time() - start_time
-            
+
+            # The exporter already walked every row, so it reports the
+            # count itself — no follow-up statistics query
+            success, count = self.world_generator.export_world_data(filepath)
+            elapsed_ns = time.perf_counter_ns() - start_ns
+
             if success:
-                stats = self.world_generator.get_world_statistics()
-                count = stats['total_generated_cubes']
                 self.display.display_export_result(True, filepath, count)
             else:
                 self.display.display_export_result(False)
             
-            if duration > 2.0:
-                self.display.display_performance_info("Export", duration)
+            if elapsed_ns > 2_000_000_000:
+                self.display.display_performance_info("Export", elapsed_ns / 1e9)
             
             self.display.display_pause()
             
@@ -207,16 +233,18 @@ class CyberpunkGame:
             confirm = self.display.get_user_input("Type 'DELETE' to confirm").upper()
             
             if confirm == 'DELETE':
-                start_time = time.time()
+                start_ns = time.perf_counter_ns()
                 self.display.display_loading_indicator("Clearing world data")
-                
+
                 count = self.world_generator.clear_world_data()
-                duration = time.time() - start_time
-                
+                # The cached location no longer exists in the database
+                self._loc_cache = (None, None)
+                elapsed_ns = time.perf_counter_ns() - start_ns
+
                 self.display.display_clear_result(count)
-                
-                if duration > 1.0:
-                    self.display.display_performance_info("Clear operation", duration)
+
+                if elapsed_ns > 1_000_000_000:
+                    self.display.display_performance_info("Clear operation", elapsed_ns / 1e9)
             else:
                 self.display.display_success_message("Operation cancelled")
             
@@ -229,16 +257,16 @@ class CyberpunkGame:
     def validate_world(self):
         """Validate world data integrity"""
         try:
-            start_time = time.time()
+            start_ns = time.perf_counter_ns()
             self.display.display_loading_indicator("Validating world data")
-            
+
             validation = self.world_generator.validate_world_integrity()
-            duration = time.time() - start_time
-            
+            elapsed_ns = time.perf_counter_ns() - start_ns
+
             self.display.display_validation_result(validation)
-            
-            if duration > 2.0:
-                self.display.display_performance_info("Validation", duration)
+
+            if elapsed_ns > 2_000_000_000:
+                self.display.display_performance_info("Validation", elapsed_ns / 1e9)
                 
         except Exception as e:
             self.display.display_error_message("Validation", f"Failed to validate world: {e}")